@@ -0,0 +1,49 @@
+#!/usr/bin/env python
+# Measures cold start time of every entry point in fresh interpreters, exits with 1 if one exceeds its budget.
+import argparse
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent.parent
+# entry point -> (code run in a fresh interpreter, budget in ms)
+ENTRY_POINTS: dict[str, tuple[str, int]] = {
+    "api": ("from src.app import init_app; init_app()", 2_500),
+    "worker": ("import src.rq.config, src.rq.worker", 1_500),
+    "cli": ("import manage", 600),
+}
+
+
+def measure(code: str, runs: int) -> float:
+    timings: list[float] = []
+    for _ in range(runs):
+        started_at = time.perf_counter()
+        subprocess.run([sys.executable, "-c", code], cwd=BASE_DIR, check=True)
+        timings.append((time.perf_counter() - started_at) * 1000)
+    return statistics.median(timings)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Entry points cold start benchmark")
+    parser.add_argument("-r", "--runs", type=int, default=5)
+    parser.add_argument(
+        "-s", "--scale",
+        type=float,
+        default=1.0,
+        help="Budgets multiplier, for slower machines",
+    )
+    args = parser.parse_args()
+    failed = False
+    for name, (code, budget) in ENTRY_POINTS.items():
+        timing = measure(code, args.runs)
+        budget *= args.scale
+        exceeded = timing > budget
+        failed |= exceeded
+        print(f"{name:<8} {timing:>8.0f} ms  budget {budget:>6.0f} ms  {'FAIL' if exceeded else 'OK'}")
+    return int(failed)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
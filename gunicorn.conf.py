@@ -11,3 +11,16 @@ graceful_timeout = 30
 max_requests = 100_000
 max_requests_jitter = 1_000
 preload = True
+
+
+def post_fork(server, worker):
+    # database engines must never be shared with the master process
+    from src.db.base import reset_db_engines
+    reset_db_engines()
+
+
+def child_exit(server, worker):
+    # live gauges of the dead worker are dropped, its counters and histograms are kept
+    from prometheus_client import multiprocess
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        multiprocess.mark_process_dead(worker.pid)
@@ -1,11 +1,26 @@
-from sqladmin import ModelView
+import logging
+from datetime import datetime, timezone
+
+from redis.exceptions import RedisError
+from sqladmin import expose, ModelView
 from sqladmin.filters import (
     BooleanFilter,
     StaticValuesFilter,
 )
+from sqlalchemy import (
+    and_,
+    func,
+    Select,
+    select,
+    text,
+    tuple_,
+)
+from starlette.exceptions import HTTPException
 from starlette.requests import Request
+from starlette.responses import StreamingResponse
 from wtforms.fields import TextAreaField
 
+from ..config import get_config
 from ..db.enums import (
     OrderStatus,
     UserRole,
@@ -14,14 +29,29 @@ from ..db.models import (
     Order,
     User,
 )
+from ..enums import ExportFormat
 from ..utils import hash_password
 from .formatters import BASE_FORMATTERS
+from .pagination import (
+    CURSOR_AFTER_PARAM,
+    CURSOR_BEFORE_PARAM,
+    decode_cursor,
+    encode_cursor,
+    KeysetPagination,
+)
 
 __all__ = (
     "OrderAdmin",
     "UserAdmin",
 )
 
+logger = logging.getLogger(__name__)
+
+LIKE_ESCAPE_CHARACTER = "\\"
+ORDERS_RELTUPLES_QUERY = text(
+    "SELECT reltuples FROM pg_class WHERE oid = CAST(:table_name AS regclass)"
+).bindparams(table_name=Order.__tablename__)
+
 
 class OrderAdmin(ModelView, model=Order):
     can_create = False
@@ -52,6 +82,176 @@ class OrderAdmin(ModelView, model=Order):
     page_size = 100
     page_size_options = [25, 50, 100, 200]
 
+    async def list(self, request: Request) -> KeysetPagination:
+        # the default order is paged by keyset on (created, id) instead of OFFSET, other sorts keep the default paging
+        if request.query_params.get("sortBy", None):
+            return await super().list(request)
+        page_size = self.validate_page_number(request.query_params.get("pageSize"), 0)
+        page_size = min(page_size or self.page_size, max(self.page_size_options))
+        search = request.query_params.get("search", None)
+        after = request.query_params.get(CURSOR_AFTER_PARAM, None)
+        before = request.query_params.get(CURSOR_BEFORE_PARAM, None)
+        # the page number is only a label carried along with the cursor, without one the first page is read
+        page = self.validate_page_number(request.query_params.get("page"), 1) if after or before else 1
+
+        stmt = self.list_query(request)
+        filtered = False
+        for filter_ in self.get_filters():
+            if value := request.query_params.get(filter_.parameter_name):
+                stmt = await filter_.get_filtered_query(stmt, value, self.model)
+                filtered = True
+        if search:
+            stmt = self.search_query(stmt=stmt, term=search)
+            filtered = True
+        count = await self._count_orders(request, stmt, filtered)
+
+        key = tuple_(Order.created, Order.id)
+        if before:
+            # the previous page is read backwards from its successor, then put back in order
+            stmt = stmt.where(key > tuple_(*decode_cursor(before))).order_by(Order.created, Order.id)
+        else:
+            if after:
+                stmt = stmt.where(key < tuple_(*decode_cursor(after)))
+            stmt = stmt.order_by(Order.created.desc(), Order.id.desc())
+        rows = list(await self._run_query(stmt.limit(page_size + 1)))
+        has_more = len(rows) > page_size
+        rows = rows[:page_size]
+        if before:
+            rows.reverse()
+            if not has_more:
+                page = 1
+        return KeysetPagination(
+            rows=rows,
+            page=page,
+            page_size=page_size,
+            count=count,
+            first_cursor=encode_cursor(rows[0].created, rows[0].id) if rows else None,
+            last_cursor=encode_cursor(rows[-1].created, rows[-1].id) if rows else None,
+            next_page_exists=bool(before) or has_more,
+        )
+
+    @expose("/stream-export")
+    async def stream_export(self, request: Request) -> StreamingResponse:
+        # streamed in constant memory, unlike the built-in export which loads every row first
+        from ..db.utils.export import (
+            check_export_format,
+            EXPORT_MEDIA_TYPES,
+            export_orders_async,
+            get_orders_export_query,
+        )
+        if request.session.get("role", None) != UserRole.ADMIN:
+            raise HTTPException(status_code=403)
+        try:
+            export_format = ExportFormat(request.query_params.get("format", ExportFormat.CSV))
+            status = request.query_params.get("status", None)
+            stmt = get_orders_export_query(
+                OrderStatus(status) if status else None,
+                _parse_datetime(request.query_params.get("created_from", None)),
+                _parse_datetime(request.query_params.get("created_to", None)),
+            )
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid export parameters")
+        try:
+            check_export_format(export_format)
+        except RuntimeError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        return StreamingResponse(
+            export_orders_async(export_format, stmt),
+            media_type=EXPORT_MEDIA_TYPES[export_format],
+            headers={"Content-Disposition": f'attachment; filename="{self.get_export_name(export_format.value)}"'},
+        )
+
+    async def on_model_change(
+        self,
+        data: dict,
+        model: Order,
+        is_created: bool,
+        request: Request,
+    ) -> None:
+        # the reservation of the phone number held before the edit is moved once the edit is committed
+        request.state.previous_phone_number = model.phone_number
+
+    async def after_model_change(
+        self,
+        data: dict,
+        model: Order,
+        is_created: bool,
+        request: Request,
+    ) -> None:
+        from ..rq import get_async_rq_queue
+        from ..rq.reservations import PhoneNumberReservations
+        previous_phone_number = getattr(request.state, "previous_phone_number", None)
+        if not get_config().rq_phone_number_reservation or previous_phone_number in (None, model.phone_number):
+            return
+        reservations = PhoneNumberReservations(get_async_rq_queue().connection)
+        try:
+            await reservations.release_async({previous_phone_number: str(model.id)})
+        except RedisError as e:
+            # workers take over reservations of orders which no longer hold their phone number
+            logger.error(f"Failed to release the phone number reservation of order {model.id}: {e}")
+        await reservations.confirm_async({model.phone_number: str(model.id)})
+
+    def search_query(self, stmt: Select, term: str) -> Select:
+        # every branch is served by an index, see `Order.__table_args__`
+        from ..rq.processors import (
+            get_phone_number_digits,
+            normalize_phone_number,
+        )
+        if phone_number := normalize_phone_number(term):
+            return stmt.where(Order.phone_number == phone_number)
+        if phone_number_digits := get_phone_number_digits(term):
+            if term.lstrip().startswith("+"):
+                # a country code prefix, as a range the unique btree index can scan whatever the collation
+                prefix = f"+{phone_number_digits}"
+                condition = Order.phone_number >= prefix
+                if upper_bound := _get_prefix_upper_bound(prefix):
+                    condition = and_(condition, Order.phone_number < upper_bound)
+                return stmt.where(condition)
+            return stmt.where(Order.phone_number.like(f"%{phone_number_digits}%"))
+        user_name = _escape_like(" ".join(term.split()))
+        return stmt.where(Order.user_name.ilike(f"%{user_name}%", escape=LIKE_ESCAPE_CHARACTER))
+
+    async def _count_orders(self, request: Request, stmt: Select, filtered: bool) -> int:
+        # planner estimates above `admin_count_estimate_threshold`, so the count does not scan the table
+        if filtered:
+            async with self.session_maker() as session:
+                connection = await session.connection()
+                # compiled by the dialect of the live connection, which knows how the server reads string literals,
+                # values are bound as parameters rather than inlined
+                compiled = stmt.compile(dialect=connection.dialect)
+                plan = (
+                    await connection.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {compiled}", compiled.params)
+                ).scalar_one()
+            estimate = int(plan[0]["Plan"]["Plan Rows"])
+        else:
+            # -1 until the table has been vacuumed or analyzed for the first time
+            ((estimate,),) = await self._run_arbitrary_query(ORDERS_RELTUPLES_QUERY)
+        if estimate >= get_config().admin_count_estimate_threshold:
+            return int(estimate)
+        return await self.count(request, select(func.count()).select_from(stmt.subquery()))
+
+
+def _parse_datetime(value: str | None) -> datetime | None:
+    # ISO 8601, in UTC unless an offset is given
+    if not value:
+        return None
+    parsed = datetime.fromisoformat(value)
+    return parsed if parsed.tzinfo is not None else parsed.replace(tzinfo=timezone.utc)
+
+
+def _escape_like(value: str) -> str:
+    for character in (LIKE_ESCAPE_CHARACTER, "%", "_"):
+        value = value.replace(character, f"{LIKE_ESCAPE_CHARACTER}{character}")
+    return value
+
+
+def _get_prefix_upper_bound(prefix: str) -> str | None:
+    # the smallest string of digits greater than every string starting with the prefix
+    digits = prefix.rstrip("9")
+    if not digits or not digits[-1].isdigit():
+        return None
+    return f"{digits[:-1]}{int(digits[-1]) + 1}"
+
 
 class UserAdmin(ModelView, model=User):
     column_default_sort = ("username", False)
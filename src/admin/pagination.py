@@ -0,0 +1,58 @@
+import uuid
+from dataclasses import dataclass
+from datetime import datetime
+
+from sqladmin.pagination import PageControl, Pagination
+from starlette.datastructures import URL
+from starlette.exceptions import HTTPException
+
+__all__ = (
+    "decode_cursor",
+    "encode_cursor",
+    "KeysetPagination",
+)
+
+CURSOR_AFTER_PARAM = "after"
+CURSOR_BEFORE_PARAM = "before"
+CURSOR_SEPARATOR = ","
+
+
+def encode_cursor(created: datetime, id_: uuid.UUID) -> str:
+    return f"{created.isoformat()}{CURSOR_SEPARATOR}{id_}"
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, uuid.UUID]:
+    try:
+        created, id_ = cursor.split(CURSOR_SEPARATOR)
+        return datetime.fromisoformat(created), uuid.UUID(id_)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid page cursor")
+
+
+@dataclass
+class KeysetPagination(Pagination):
+    # the page number is only displayed, rows are located by the (created, id) cursor of a neighbouring page
+    first_cursor: str | None = None
+    last_cursor: str | None = None
+    next_page_exists: bool = False
+
+    @property
+    def has_next(self) -> bool:
+        return self.next_page_exists
+
+    def __post_init__(self) -> None:
+        # the count may be an estimate, the page is never clamped to it
+        pass
+
+    def add_pagination_urls(self, base_url: URL) -> None:
+        current_url = base_url.include_query_params(page=self.page)
+        base_url = base_url.remove_query_params((CURSOR_AFTER_PARAM, CURSOR_BEFORE_PARAM))
+        if self.has_previous:
+            previous_url = base_url.include_query_params(page=self.page - 1)
+            if self.page > 2:
+                previous_url = previous_url.include_query_params(**{CURSOR_BEFORE_PARAM: self.first_cursor})
+            self.page_controls.append(PageControl(number=self.page - 1, url=str(previous_url)))
+        self.page_controls.append(PageControl(number=self.page, url=str(current_url)))
+        if self.has_next:
+            next_url = base_url.include_query_params(page=self.page + 1, **{CURSOR_AFTER_PARAM: self.last_cursor})
+            self.page_controls.append(PageControl(number=self.page + 1, url=str(next_url)))
@@ -2,7 +2,7 @@ from fastapi import FastAPI
 from sqladmin import Admin
 
 from ..config import Config
-from ..db.base import AsyncDBEngine, AsyncDBSession
+from ..db.base import AsyncDBSession
 from .auth import AdminAuthenticationBackend
 from .models import (
     OrderAdmin,
@@ -15,7 +15,6 @@ __all__ = ("register_admin_view",)
 def register_admin_view(app: FastAPI, config: Config) -> None:
     admin = Admin(
         app,
-        AsyncDBEngine,
         session_maker=AsyncDBSession,
         base_url="/api/admin",
         authentication_backend=AdminAuthenticationBackend(config),
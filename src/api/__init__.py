@@ -5,16 +5,36 @@ from fastapi import (
 )
 from fastapi.responses import ORJSONResponse
 
+from ..metrics import (
+    CONTENT_TYPE_LATEST,
+    generate_metrics,
+)
+from ..rq import get_async_rq_queue
+from ..rq.backlog import get_size_and_oldest_job_age_async
 from .routers import orders_router
 
 health_router = APIRouter(include_in_schema=False)
 
 
 @health_router.get("/health", status_code=status.HTTP_200_OK)
-def health() -> Response:
+async def health() -> Response:
     return Response()
 
 
+metrics_router = APIRouter(include_in_schema=False)
+
+
+@metrics_router.get("/metrics", status_code=status.HTTP_200_OK)
+async def metrics() -> Response:
+    queue = get_async_rq_queue()
+    queue_size, queue_oldest_job_age = await get_size_and_oldest_job_age_async(queue)
+    return Response(
+        generate_metrics(queue.name, queue_size, queue_oldest_job_age),
+        media_type=CONTENT_TYPE_LATEST,
+    )
+
+
 router = APIRouter(default_response_class=ORJSONResponse)
 router.include_router(health_router)
+router.include_router(metrics_router)
 router.include_router(orders_router, prefix="/api")
@@ -5,19 +5,23 @@ from fastapi import (
     APIRouter,
     Body,
     Depends,
+    Header,
     Path,
+    Query,
     status,
 )
+from fastapi.responses import StreamingResponse
 from pydantic import UUID4
 
 from ...schemas import (
     Order,
+    OrderBatchItem,
     OrderId,
     OrderStatus,
 )
 from ...services import (
-    get_order_service,
-    OrderService,
+    AsyncOrderService,
+    get_async_order_service,
 )
 from ..responses import VALIDATION_ERROR_RESPONSE
 
@@ -31,6 +35,40 @@ ORDER_BODY = t.Annotated[
         },
     ),
 ]
+ORDERS_BATCH_BODY = t.Annotated[
+    list[dict[str, t.Any]],
+    Body(
+        description="Orders batch body",
+        min_length=1,
+        example=[
+            {
+                "user_name": "John Doe",
+                "phone_number": "+375 29 111-11-11",
+            },
+            {
+                "user_name": "Jane Doe",
+                "phone_number": "+375 29 222-22-22",
+            },
+        ],
+    ),
+]
+ORDER_IDS_BODY = t.Annotated[
+    list[t.Annotated[uuid.UUID, UUID4]],
+    Body(
+        description="Order ids",
+        min_length=1,
+        example=[uuid.uuid4(), uuid.uuid4()],
+    ),
+]
+IDEMPOTENCY_KEY_HEADER = t.Annotated[
+    str | None,
+    Header(
+        description="Client generated key, repeated requests with the same key return the original order id",
+        min_length=1,
+        max_length=255,
+        example=str(uuid.uuid4()),
+    ),
+]
 ORDER_ID_PATH = t.Annotated[
     uuid.UUID,
     UUID4,
@@ -39,6 +77,14 @@ ORDER_ID_PATH = t.Annotated[
         example=uuid.uuid4(),
     ),
 ]
+ORDER_STATUS_WAIT_QUERY = t.Annotated[
+    str | None,
+    Query(
+        description="Maximum time in seconds to wait for the final order status",
+        pattern=r"^\d{1,4}s?$",
+        example="5s",
+    ),
+]
 
 
 orders_router = APIRouter(prefix="/orders", tags=["orders",],)
@@ -50,11 +96,38 @@ orders_router = APIRouter(prefix="/orders", tags=["orders",],)
     responses=VALIDATION_ERROR_RESPONSE,
     status_code=status.HTTP_201_CREATED,
 )
-def create_order(
+async def create_order(
     payload: ORDER_BODY,
-    order_service: OrderService = Depends(get_order_service),
+    idempotency_key: IDEMPOTENCY_KEY_HEADER = None,
+    order_service: AsyncOrderService = Depends(get_async_order_service),
 ) -> OrderId:
-    return order_service.create_order(payload)
+    return await order_service.create_order(payload, idempotency_key)
+
+
+@orders_router.post(
+    "/batch",
+    response_model=list[OrderBatchItem],
+    responses=VALIDATION_ERROR_RESPONSE,
+    status_code=status.HTTP_200_OK,
+)
+async def create_orders(
+    payload: ORDERS_BATCH_BODY,
+    order_service: AsyncOrderService = Depends(get_async_order_service),
+) -> list[OrderBatchItem]:
+    return await order_service.create_orders(payload)
+
+
+@orders_router.post(
+    "/status:batch",
+    response_model=dict[uuid.UUID, OrderStatus | None],
+    responses=VALIDATION_ERROR_RESPONSE,
+    status_code=status.HTTP_200_OK,
+)
+async def get_order_statuses(
+    payload: ORDER_IDS_BODY,
+    order_service: AsyncOrderService = Depends(get_async_order_service),
+) -> dict[uuid.UUID, OrderStatus | None]:
+    return await order_service.get_order_statuses(payload)
 
 
 @orders_router.get(
@@ -63,8 +136,42 @@ def create_order(
     responses=VALIDATION_ERROR_RESPONSE,
     status_code=status.HTTP_200_OK,
 )
-def get_order_status(
+async def get_order_status(
     order_id: ORDER_ID_PATH,
-    order_service: OrderService = Depends(get_order_service),
+    wait: ORDER_STATUS_WAIT_QUERY = None,
+    order_service: AsyncOrderService = Depends(get_async_order_service),
 ) -> OrderStatus:
-    return order_service.get_order_status(order_id)
+    return await order_service.wait_order_status(order_id, int(wait.removesuffix("s")) if wait else 0)
+
+
+async def _order_status_events(events: t.AsyncIterator[OrderStatus | None]) -> t.AsyncIterator[str]:
+    async for order_status in events:
+        if order_status is None:
+            yield ": keepalive\n\n"
+        else:
+            yield f"event: status\ndata: {order_status.model_dump_json()}\n\n"
+
+
+@orders_router.get(
+    "/{order_id}/status/stream",
+    response_class=StreamingResponse,
+    responses={
+        **VALIDATION_ERROR_RESPONSE,
+        status.HTTP_200_OK: {"content": {"text/event-stream": {}}},
+    },
+    status_code=status.HTTP_200_OK,
+)
+async def stream_order_status(
+    order_id: ORDER_ID_PATH,
+    order_service: AsyncOrderService = Depends(get_async_order_service),
+) -> StreamingResponse:
+    # unknown orders are rejected before the stream is opened
+    await order_service.get_order_status(order_id)
+    return StreamingResponse(
+        _order_status_events(order_service.stream_order_status(order_id)),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no",
+        },
+    )
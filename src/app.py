@@ -18,10 +18,13 @@ from .config import Config, get_config
 from .enums import Environment
 from .exceptions import HTTPException
 from .logging import get_logging_config
+from .metrics import MetricsMiddleware
 from .rq.utils import (
-    shutdown_redis_resources,
-    startup_redis_resources,
+    shutdown_async_redis_resources,
+    startup_async_redis_resources,
 )
+from .tracing import flush_spans
+from .utils import get_validation_errors
 
 logger = logging.getLogger(__name__)
 
@@ -29,9 +32,10 @@ logger = logging.getLogger(__name__)
 @asynccontextmanager
 async def lifespan(_: FastAPI):
     config = get_config()
-    startup_redis_resources(config)
+    await startup_async_redis_resources(config)
     yield
-    shutdown_redis_resources()
+    await shutdown_async_redis_resources()
+    flush_spans()
 
 
 def patch_openapi_schema(app: FastAPI) -> None:
@@ -66,7 +70,7 @@ def redis_exception_handler(request: Request, exc: RedisError) -> ORJSONResponse
 
 
 def validation_exception_handler(_: Request, exc: RequestValidationError) -> ORJSONResponse:
-    errors: dict[str, str] = {str(error["loc"][-1]): error["msg"] for error in exc.errors()}
+    errors: dict[str, str] = get_validation_errors(exc.errors())
     return ORJSONResponse(
         status_code=status.HTTP_400_BAD_REQUEST,
         content={
@@ -79,7 +83,8 @@ def validation_exception_handler(_: Request, exc: RequestValidationError) -> ORJ
 def http_exception_handler(_: Request, exc: HTTPException) -> ORJSONResponse:
     return ORJSONResponse(
         status_code=exc.status_code,
-        content={"detail": exc.detail}
+        content={"detail": exc.detail},
+        headers=exc.headers,
     )
 
 
@@ -105,6 +110,7 @@ def init_app():
         docs_url="/api/docs",
         redoc_url="/api/redoc",
     )
+    app.add_middleware(MetricsMiddleware)
     register_admin_view(app, config)
     app.include_router(router)
     app.add_exception_handler(RedisError, redis_exception_handler)
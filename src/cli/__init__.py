@@ -1,5 +1,6 @@
 import click
 
 from .db import cli as db_cli
+from .rq import cli as rq_cli
 
-cli = click.CommandCollection(sources=[db_cli,])
+cli = click.CommandCollection(sources=[db_cli, rq_cli,])
@@ -1,11 +1,11 @@
+import typing as t
+from datetime import datetime, timezone
+from pathlib import Path
+
 import click
 
-from ..db.enums import UserRole
-from ..db.utils import (
-    create_default_users as _create_default_users,
-    create_user as _create_user,
-    delete_all_orders as _delete_all_orders,
-)
+from ..db.enums import OrderStatus, UserRole
+from ..enums import ExportFormat, ImportFormat
 
 
 @click.group()
@@ -15,6 +15,7 @@ def cli() -> None:
 
 @cli.command("create_default_users")
 def create_default_users() -> None:
+    from ..db.utils.user import create_default_users as _create_default_users
     _create_default_users()
 
 
@@ -23,9 +24,141 @@ def create_default_users() -> None:
 @click.option("-p", "--password", type=str, required=True)
 @click.option("-r", "--role", type=click.Choice(UserRole), required=True)
 def create_user(username: str, password: str, role: UserRole) -> None:
+    from ..db.utils.user import create_user as _create_user
     _create_user(username, password, role)
 
 
 @cli.command("delete_all_orders")
 def delete_all_orders() -> None:
+    import redis
+
+    from ..config import get_config
+    from ..db.utils.order import delete_all_orders as _delete_all_orders
+    from ..rq.reservations import PhoneNumberReservations
+
     _delete_all_orders()
+    config = get_config()
+    if config.rq_phone_number_reservation:
+        with redis.Redis.from_url(config.redis_dsn.unicode_string()) as connection:
+            PhoneNumberReservations(connection).clear()
+
+
+@cli.command("purge_orders")
+@click.option("--created-before", type=click.DateTime(), required=True, help="Exclusive, in UTC")
+@click.option("-s", "--status", type=click.Choice(OrderStatus), default=None)
+@click.option("--after", type=str, default=None, help="Resumes after the last deleted order reported by a previous run")
+def purge_orders(created_before: datetime, status: OrderStatus | None, after: str | None) -> None:
+    import uuid
+    from itertools import batched
+
+    import redis
+    from sqlalchemy import Row
+
+    from ..config import get_config
+    from ..db.utils.order import purge_orders as _purge_orders
+    from ..rq.reservations import PhoneNumberReservations
+    from ..rq.status_store import get_order_status_key
+
+    resume_key: tuple[datetime, uuid.UUID] | None = None
+    if after:
+        try:
+            created, order_id = after.split(",")
+            resume_key = datetime.fromisoformat(created), uuid.UUID(order_id)
+        except ValueError:
+            raise click.BadParameter("expected the `created,id` key of an order", param_hint="--after")
+    config = get_config()
+    count = 0
+    # orders already deleted whose Redis records could not be dropped yet
+    failed_rows: list[Row] = []
+
+    with redis.Redis.from_url(config.redis_dsn.unicode_string()) as connection:
+        reservations = PhoneNumberReservations(connection) if config.rq_phone_number_reservation else None
+
+        def clean_up(rows: t.Sequence[Row]) -> None:
+            # the reservations and status records of deleted orders are dropped with them, both idempotently
+            if reservations:
+                reservations.release({row.phone_number: str(row.id) for row in rows})
+            connection.unlink(*(get_order_status_key(str(row.id)) for row in rows))
+
+        def on_batch(rows: list[Row]) -> None:
+            nonlocal count
+            count += len(rows)
+            last = max(rows, key=lambda row: (row.created, row.id))
+            try:
+                clean_up(rows)
+            except redis.RedisError as e:
+                click.echo(f"Failed to clean up {len(rows)} orders, retrying once the purge is over: {e}", err=True)
+                failed_rows.extend(rows)
+            click.echo(f"Deleted {count} orders, last {last.created.isoformat()},{last.id}", err=True)
+
+        _purge_orders(_as_utc(created_before), status, resume_key, on_batch)
+        for rows in batched(failed_rows, config.admin_purge_batch_size):
+            try:
+                clean_up(rows)
+            except redis.RedisError as e:
+                raise click.ClickException(
+                    f"Failed to clean up the Redis records of {len(failed_rows)} purged orders: {e}"
+                )
+    click.echo(f"Purged {count} orders", err=True)
+
+
+def _check_export_format(ctx: click.Context, param: click.Parameter, export_format: ExportFormat) -> ExportFormat:
+    from ..db.utils.export import check_export_format
+
+    try:
+        check_export_format(export_format)
+    except RuntimeError as e:
+        raise click.BadParameter(str(e))
+    return export_format
+
+
+@cli.command("export_orders")
+@click.option("-f", "--format", "export_format", type=click.Choice(ExportFormat), default=ExportFormat.CSV,
+              callback=_check_export_format)
+@click.option("-o", "--output", type=click.File("wb"), default="-")
+@click.option("-s", "--status", type=click.Choice(OrderStatus), default=None)
+@click.option("--created-from", type=click.DateTime(), default=None, help="Inclusive, in UTC")
+@click.option("--created-to", type=click.DateTime(), default=None, help="Exclusive, in UTC")
+def export_orders(
+    export_format: ExportFormat,
+    output: t.BinaryIO,
+    status: OrderStatus | None,
+    created_from: datetime | None,
+    created_to: datetime | None,
+) -> None:
+    from ..db.utils.export import export_orders as _export_orders, get_orders_export_query
+
+    stmt = get_orders_export_query(status, _as_utc(created_from), _as_utc(created_to))
+    for data in _export_orders(export_format, stmt):
+        output.write(data)
+
+
+@cli.command("import_orders")
+@click.argument("files", nargs=-1, required=True, type=click.Path(exists=True, dir_okay=False, path_type=Path))
+@click.option("-f", "--format", "import_format", type=click.Choice(ImportFormat), default=None,
+              help="Detected from the file extension by default")
+@click.option("-r", "--rejects", type=click.File("w"), default="-", help="CSV report of the rejected rows")
+def import_orders(files: tuple[Path, ...], import_format: ImportFormat | None, rejects: t.TextIO) -> None:
+    import csv
+
+    import redis
+
+    from ..config import get_config
+    from ..db.utils.bulk_import import import_orders as _import_orders
+    from ..rq.reservations import PhoneNumberReservations
+
+    writer = csv.writer(rejects)
+    writer.writerow(("file", "line", "detail"))
+    config = get_config()
+    with redis.Redis.from_url(config.redis_dsn.unicode_string()) as connection:
+        accepted, rejected = _import_orders(
+            files,
+            import_format,
+            lambda path, line, detail: writer.writerow((path, line, detail)),
+            PhoneNumberReservations(connection) if config.rq_phone_number_reservation else None,
+        )
+    click.echo(f"Imported {accepted} orders, rejected {rejected}", err=True)
+
+
+def _as_utc(value: datetime | None) -> datetime | None:
+    return value.replace(tzinfo=timezone.utc) if value is not None else None
@@ -0,0 +1,41 @@
+import click
+
+
+@click.group()
+def cli() -> None:
+    pass
+
+
+@cli.command("worker_pool")
+@click.option("-n", "--num-workers", type=int, default=None)
+@click.option("-b", "--burst", is_flag=True, default=False)
+@click.option("-a", "--asyncio", "use_asyncio", is_flag=True, default=False)
+def worker_pool(num_workers: int | None, burst: bool, use_asyncio: bool) -> None:
+    import os
+    import shutil
+    import tempfile
+
+    import redis
+
+    from ..config import get_config
+
+    config = get_config()
+    metrics_dir: str | None = None
+    if config.metrics_worker_port and "PROMETHEUS_MULTIPROC_DIR" not in os.environ:
+        # must be set before the metrics are created, so every forked worker writes its own samples there
+        metrics_dir = os.environ["PROMETHEUS_MULTIPROC_DIR"] = tempfile.mkdtemp(prefix="final_price_metrics_")
+
+    from ..rq.worker import AsyncDBWorker, DBWorker
+    from ..rq.worker_pool import DBWorkerPool
+
+    pool = DBWorkerPool(
+        [config.rq_queue_name],
+        connection=redis.Redis.from_url(config.redis_dsn.unicode_string()),
+        num_workers=num_workers or config.rq_worker_pool_size,
+        worker_class=AsyncDBWorker if use_asyncio else DBWorker,
+    )
+    try:
+        pool.start(burst=burst)
+    finally:
+        if metrics_dir:
+            shutil.rmtree(metrics_dir, ignore_errors=True)
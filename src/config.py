@@ -1,3 +1,4 @@
+import os
 from functools import cache, cached_property
 from pathlib import Path
 
@@ -9,7 +10,10 @@ from pydantic import (
 )
 from pydantic_settings import BaseSettings
 
-from .enums import Environment
+from .enums import (
+    Environment,
+    TracingExporter,
+)
 
 __all__ = (
     "Config",
@@ -26,16 +30,64 @@ class Config(BaseSettings):
     default_admin_password: str = Field(...)
     default_user_username: str = Field(...)
     default_user_password: str = Field(...)
+    # Admin
+    admin_count_estimate_threshold: int = Field(default=100_000, ge=0)
+    admin_export_chunk_size: int = Field(default=10_000, ge=1)
+    admin_import_chunk_size: int = Field(default=10_000, ge=1)
+    admin_purge_batch_size: int = Field(default=1_000, ge=1)
+    admin_purge_batch_sleep: int = Field(default=100, ge=0)  # ms.
+    # API
+    api_admission_max_queue_age: int | None = Field(default=None, ge=1)  # s.
+    api_admission_max_queue_size: int | None = Field(default=None, ge=1)
+    api_admission_refresh_interval: int = Field(default=250, ge=0)  # ms.
+    api_admission_retry_after: int = Field(default=5, ge=1)  # s.
+    api_orders_batch_max_size: int = Field(default=100, ge=1)
+    api_orders_dedup_ttl: int = Field(default=60 * 10, ge=0)  # 10 m.
+    api_orders_edge_validation: bool = Field(default=False)
+    api_orders_idempotency_ttl: int = Field(default=60 * 60 * 24, ge=0)  # 1 d.
+    api_order_status_batch_max_size: int = Field(default=500, ge=1)
+    api_order_status_cache_size: int = Field(default=100_000, ge=0)
+    api_order_status_db_batch_max_size: int = Field(default=500, ge=1)
+    api_order_status_db_batch_wait: int = Field(default=5, ge=0)  # ms.
+    api_order_status_max_wait: int = Field(default=30, ge=1)  # s.
+    api_order_status_stream_keepalive: int = Field(default=15, ge=1)  # s.
+    api_order_status_stream_timeout: int = Field(default=60 * 5, ge=1)  # 5 m.
+    # Metrics
+    metrics_worker_port: int | None = Field(default=None, ge=1, le=65_535)
     # Postgres
     postgres_dsn: PostgresDsn = Field(...)
+    postgres_pool_size: int = Field(default=5, ge=1)
+    postgres_max_overflow: int = Field(default=10, ge=0)
+    postgres_pool_recycle: int = Field(default=60 * 30, ge=-1)  # 30 m.
+    postgres_pool_timeout: int = Field(default=30, ge=1)  # s.
     # Redis / RQ
     redis_dsn: RedisDsn = Field(...)
+    redis_max_connections: int = Field(default=64, ge=1)
+    redis_pool_timeout: int = Field(default=5, ge=1)  # s.
     rq_queue_name: str = Field(...)
     rq_job_retry: bool = Field(default=False)
     rq_job_retry_count: int = Field(default=3, ge=1)
     rq_job_timeout: int = Field(default=60, ge=5)  # 1 m.
     rq_job_result_ttl: int = Field(default=60 * 5, ge=60)  # 5 m.
     rq_job_failure_ttl: int = Field(default=60 * 60, ge=60 * 5)  # 1 h.
+    rq_phone_number_reservation: bool = Field(default=False)
+    rq_phone_number_reservation_ttl: int = Field(default=60 * 5, ge=1)  # 5 m.
+    rq_order_status_ttl: int = Field(default=60 * 60 * 24 * 7, ge=60 * 60)  # 7 d.
+    rq_worker_batch_size: int = Field(default=1, ge=1, le=1_000)
+    rq_worker_batch_wait: int = Field(default=50, ge=0)  # ms.
+    rq_worker_concurrency: int = Field(default=16, ge=1, le=1_000)
+    rq_worker_max_jobs: int | None = Field(default=None, ge=1)
+    rq_worker_max_memory: int | None = Field(default=None, ge=1)  # MB.
+    rq_worker_pool_size: int = Field(default=os.cpu_count() or 1, ge=1)
+    # Tracing
+    tracing_exporter: TracingExporter | None = Field(default=None)
+    tracing_export_interval: int = Field(default=5, ge=1)  # s.
+    tracing_file: Path = Field(default=Path("traces.jsonl"))
+    tracing_otlp_endpoint: str = Field(default="http://localhost:4318/v1/traces")
+    tracing_sample_rate: float = Field(default=1.0, ge=0, le=1)
+    tracing_service_name: str = Field(default="final_price")
+    # Validation
+    validation_phone_number_cache_size: int = Field(default=65_536, ge=0)
 
     @computed_field
     @cached_property
@@ -0,0 +1,42 @@
+"""orders created id index
+
+Revision ID: dbb16f71cd8b
+Revises: 894b747ee888
+Create Date: 2026-10-18 12:05:41.318204
+
+"""
+from typing import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "dbb16f71cd8b"
+down_revision: str | Sequence[str] | None = "894b747ee888"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # built without locking the table against writes, which requires running outside of a transaction
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_orders_created_id",
+            "orders",
+            ["created", "id"],
+            unique=False,
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_orders_created_id",
+            table_name="orders",
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
@@ -0,0 +1,53 @@
+"""orders trigram indexes
+
+Revision ID: f198d43c97ec
+Revises: dbb16f71cd8b
+Create Date: 2026-10-18 12:41:07.520913
+
+"""
+from typing import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "f198d43c97ec"
+down_revision: str | Sequence[str] | None = "dbb16f71cd8b"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+TRIGRAM_INDEXES: dict[str, str] = {
+    "ix_orders_user_name_trgm": "user_name",
+    "ix_orders_phone_number_trgm": "phone_number",
+}
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute(sa.text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+    # built without locking the table against writes, which requires running outside of a transaction
+    with op.get_context().autocommit_block():
+        for index_name, column in TRIGRAM_INDEXES.items():
+            op.create_index(
+                index_name,
+                "orders",
+                [column],
+                unique=False,
+                postgresql_using="gin",
+                postgresql_ops={column: "gin_trgm_ops"},
+                postgresql_concurrently=True,
+                if_not_exists=True,
+            )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # the extension is left in place, other objects of the database may depend on it
+    with op.get_context().autocommit_block():
+        for index_name in TRIGRAM_INDEXES:
+            op.drop_index(
+                index_name,
+                table_name="orders",
+                postgresql_concurrently=True,
+                if_exists=True,
+            )
@@ -1,3 +1,5 @@
+import os
+
 import orjson
 from sqlalchemy import create_engine, Engine
 from sqlalchemy.ext.asyncio import (
@@ -11,7 +13,6 @@ from sqlalchemy.orm import (
     Session,
     sessionmaker,
 )
-from sqlalchemy.pool import SingletonThreadPool
 
 from ..config import (
     Config,
@@ -19,11 +20,15 @@ from ..config import (
 )
 
 __all__ = (
+    "AsyncDBSession",
+    "create_async_db_engine",
     "create_db_engine",
-    "DBEngine",
     "DBSession",
     "DeclarativeBase",
+    "get_async_db_engine",
+    "get_db_engine",
     "MetaData",
+    "reset_db_engines",
 )
 
 
@@ -31,7 +36,16 @@ class DeclarativeBase(_DeclarativeBase):
     pass
 
 
-def create_async_db_engine(config: Config, connect_args: dict | None = None) -> AsyncEngine:
+def _get_pool_params(config: Config) -> dict:
+    return {
+        "pool_size": config.postgres_pool_size,
+        "max_overflow": config.postgres_max_overflow,
+        "pool_recycle": config.postgres_pool_recycle,
+        "pool_timeout": config.postgres_pool_timeout,
+    }
+
+
+def create_async_db_engine(config: Config, connect_args: dict | None = None, **kwargs) -> AsyncEngine:
     return create_async_engine(
         config.postgres_dsn.unicode_string(),
         echo=config.debug,
@@ -39,23 +53,74 @@ def create_async_db_engine(config: Config, connect_args: dict | None = None) ->
         json_deserializer=lambda o: orjson.loads(o),
         json_serializer=lambda o: orjson.dumps(o),
         connect_args=connect_args or {},
+        **{**_get_pool_params(config), **kwargs},
     )
 
 
-def create_db_engine(config: Config, connect_args: dict | None = None) -> Engine:
+def create_db_engine(config: Config, connect_args: dict | None = None, **kwargs) -> Engine:
     return create_engine(
         config.postgres_dsn.unicode_string(),
         echo=config.debug,
-        poolclass=SingletonThreadPool,
         pool_pre_ping=True,
         json_deserializer=lambda o: orjson.loads(o),
         json_serializer=lambda o: orjson.dumps(o),
         connect_args=connect_args or {},
+        **{**_get_pool_params(config), **kwargs},
     )
 
 
+# engines are created on first use in the process using them, never inherited through fork
+_DB_ENGINE: Engine | None = None
+_ASYNC_DB_ENGINE: AsyncEngine | None = None
+_DB_ENGINES_PID: int | None = None
+
+
+def _check_db_engines_pid() -> None:
+    global _DB_ENGINES_PID
+    if _DB_ENGINES_PID != os.getpid():
+        reset_db_engines()
+        _DB_ENGINES_PID = os.getpid()
+
+
+def get_db_engine() -> Engine:
+    global _DB_ENGINE
+    _check_db_engines_pid()
+    if _DB_ENGINE is None:
+        _DB_ENGINE = create_db_engine(get_config())
+    return _DB_ENGINE
+
+
+def get_async_db_engine() -> AsyncEngine:
+    global _ASYNC_DB_ENGINE
+    _check_db_engines_pid()
+    if _ASYNC_DB_ENGINE is None:
+        _ASYNC_DB_ENGINE = create_async_db_engine(get_config())
+    return _ASYNC_DB_ENGINE
+
+
+def reset_db_engines() -> None:
+    # called after fork, connections of the parent are left untouched for the parent to use
+    global _DB_ENGINE, _ASYNC_DB_ENGINE
+    if _DB_ENGINE is not None:
+        _DB_ENGINE.dispose(close=False)
+        _DB_ENGINE = None
+    if _ASYNC_DB_ENGINE is not None:
+        _ASYNC_DB_ENGINE.sync_engine.dispose(close=False)
+        _ASYNC_DB_ENGINE = None
+
+
+class _DBSessionMaker(sessionmaker[Session]):
+    def __call__(self, **local_kw) -> Session:
+        local_kw.setdefault("bind", get_db_engine())
+        return super().__call__(**local_kw)
+
+
+class _AsyncDBSessionMaker(async_sessionmaker[AsyncSession]):
+    def __call__(self, **local_kw) -> AsyncSession:
+        local_kw.setdefault("bind", get_async_db_engine())
+        return super().__call__(**local_kw)
+
+
 MetaData = DeclarativeBase.metadata
-AsyncDBEngine = create_async_db_engine(get_config())
-DBEngine = create_db_engine(get_config())
-DBSession: sessionmaker[Session] = sessionmaker(DBEngine, expire_on_commit=False)
-AsyncDBSession: async_sessionmaker[AsyncSession] = async_sessionmaker(AsyncDBEngine)
+DBSession: sessionmaker[Session] = _DBSessionMaker(expire_on_commit=False)
+AsyncDBSession: async_sessionmaker[AsyncSession] = _AsyncDBSessionMaker()
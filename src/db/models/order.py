@@ -14,6 +14,23 @@ __all__ = ("Order",)
 
 class Order(DeclarativeBase):
     __tablename__ = "orders"
+    __table_args__ = (
+        # keyset pagination of the admin list view, newest first
+        sqlalchemy.Index("ix_orders_created_id", "created", "id"),
+        # substring search of the admin list view, requires the pg_trgm extension
+        sqlalchemy.Index(
+            "ix_orders_user_name_trgm",
+            "user_name",
+            postgresql_using="gin",
+            postgresql_ops={"user_name": "gin_trgm_ops"},
+        ),
+        sqlalchemy.Index(
+            "ix_orders_phone_number_trgm",
+            "phone_number",
+            postgresql_using="gin",
+            postgresql_ops={"phone_number": "gin_trgm_ops"},
+        ),
+    )
 
     id: Mapped[uuid.UUID] = mapped_column(
         UUID(as_uuid=True),
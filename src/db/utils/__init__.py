@@ -1,5 +1,39 @@
-from .order import delete_all_orders
-from .user import (
-    create_default_users,
-    create_user,
+import importlib
+import typing as t
+
+__all__ = (
+    "create_default_users",
+    "create_user",
+    "delete_all_orders",
+    "export_orders",
+    "export_orders_async",
+    "get_existing_order_ids",
+    "get_order_ids_loader",
+    "get_import_format",
+    "get_orders_export_query",
+    "import_orders",
+    "OrderIdsLoader",
+    "purge_orders",
 )
+
+_MODULES: dict[str, str] = {
+    "create_default_users": ".user",
+    "create_user": ".user",
+    "delete_all_orders": ".order",
+    "export_orders": ".export",
+    "export_orders_async": ".export",
+    "get_existing_order_ids": ".order",
+    "get_order_ids_loader": ".order",
+    "get_import_format": ".bulk_import",
+    "get_orders_export_query": ".export",
+    "import_orders": ".bulk_import",
+    "OrderIdsLoader": ".order",
+    "purge_orders": ".order",
+}
+
+
+def __getattr__(name: str) -> t.Any:
+    # submodules are imported on first use, so CLI commands only load what they need
+    if name in _MODULES:
+        return getattr(importlib.import_module(_MODULES[name], __name__), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,189 @@
+import csv
+import typing as t
+import uuid
+from itertools import batched
+from pathlib import Path
+
+import orjson
+from pydantic import ValidationError
+
+from ...config import get_config
+from ...enums import (
+    ImportFormat,
+    OrderRejectionReason,
+)
+from ...rq.processors import validate_orders
+from ...rq.reservations import PhoneNumberReservations
+from ...schemas.order import Order as OrderSchema
+from ..base import get_db_engine
+from ..enums import OrderStatus
+from ..models import Order
+
+__all__ = (
+    "get_import_format",
+    "import_orders",
+)
+
+INVALID_JSON = "Invalid JSON"
+JSONL_SUFFIXES = (".jsonl", ".ndjson")
+# accepted rows are copied into a temporary table first, it is never WAL-logged and is dropped once the orders it
+# imported have been reserved, after the commit
+STAGING_TABLE = "orders_import"
+CREATE_STAGING_TABLE_QUERY = f"""
+CREATE TEMPORARY TABLE {STAGING_TABLE} (
+    source integer NOT NULL,
+    line integer NOT NULL,
+    id uuid NOT NULL,
+    user_name varchar(256) NOT NULL,
+    phone_number varchar(32) NOT NULL
+)
+"""
+DROP_STAGING_TABLE_QUERY = f"DROP TABLE IF EXISTS {STAGING_TABLE}"
+COPY_STAGING_TABLE_QUERY = f"COPY {STAGING_TABLE} (source, line, id, user_name, phone_number) FROM STDIN"
+# temporary tables are not analyzed by autovacuum
+ANALYZE_STAGING_TABLE_QUERY = f"ANALYZE {STAGING_TABLE}"
+# the first row of a phone number wins, later ones and already registered ones are skipped
+INSERT_ORDERS_QUERY = f"""
+INSERT INTO {Order.__tablename__} (id, user_name, phone_number, status)
+SELECT id, user_name, phone_number, CAST(%s AS {Order.status.type.name})
+FROM {STAGING_TABLE}
+ORDER BY source, line
+ON CONFLICT (phone_number) DO NOTHING
+"""
+SKIPPED_ROWS_QUERY = f"""
+SELECT source, line
+FROM {STAGING_TABLE} AS staged
+WHERE NOT EXISTS (SELECT 1 FROM {Order.__tablename__} WHERE {Order.__tablename__}.id = staged.id)
+ORDER BY source, line
+"""
+IMPORTED_ROWS_QUERY = f"""
+SELECT staged.phone_number, staged.id
+FROM {STAGING_TABLE} AS staged
+JOIN {Order.__tablename__} ON {Order.__tablename__}.id = staged.id
+"""
+
+
+def get_import_format(path: Path) -> ImportFormat:
+    return ImportFormat.JSONL if path.suffix.lower() in JSONL_SUFFIXES else ImportFormat.CSV
+
+
+def _read_rows(path: Path, import_format: ImportFormat) -> t.Iterator[tuple[int, t.Any]]:
+    # (line number, raw row), lines which are not valid JSON are passed on as `None`
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        match import_format:
+            case ImportFormat.CSV:
+                reader = csv.DictReader(f)
+                for row in reader:
+                    yield reader.line_num, row
+            case ImportFormat.JSONL:
+                for line_number, line in enumerate(f, 1):
+                    if not line.strip():
+                        continue
+                    try:
+                        yield line_number, orjson.loads(line)
+                    except orjson.JSONDecodeError:
+                        yield line_number, None
+
+
+def _parse_row(row: t.Any) -> tuple[dict | None, str | None]:
+    # the same constraints as an order submitted to the API
+    if row is None:
+        return None, INVALID_JSON
+    try:
+        order = OrderSchema.model_validate(row)
+    except ValidationError as e:
+        error = e.errors()[0]
+        return None, f"{'.'.join(map(str, error['loc'])) or 'row'}: {error['msg']}"
+    return order.model_dump(), None
+
+
+def _get_staging_rows(
+    paths: t.Sequence[Path],
+    import_format: ImportFormat | None,
+    chunk_size: int,
+    reject: t.Callable[[Path, int, str], None],
+) -> t.Iterator[tuple[int, int, uuid.UUID, str, str]]:
+    # rows are validated a chunk at a time, so each distinct value is validated once per chunk
+    for source, path in enumerate(paths):
+        for chunk in batched(_read_rows(path, import_format or get_import_format(path)), chunk_size):
+            lines: list[int] = []
+            orders: list[dict] = []
+            for line, row in chunk:
+                order, detail = _parse_row(row)
+                if order is None:
+                    reject(path, line, detail)
+                    continue
+                lines.append(line)
+                orders.append(order)
+            validation_results = validate_orders(orders)
+            for index, line in enumerate(lines):
+                if rejection := validation_results.rejections[index]:
+                    reject(path, line, rejection["detail"])
+                    continue
+                yield (
+                    source,
+                    line,
+                    uuid.uuid4(),
+                    validation_results.user_names[index],
+                    validation_results.phone_numbers[index],
+                )
+
+
+def import_orders(
+    paths: t.Sequence[Path],
+    import_format: ImportFormat | None = None,
+    on_reject: t.Callable[[Path, int, str], None] | None = None,
+    phone_number_reservations: PhoneNumberReservations | None = None,
+) -> tuple[int, int]:
+    # accepted and rejected counts, every rejected row is reported to `on_reject` with its file and line,
+    # orders are imported all or nothing, in a single transaction
+    chunk_size = get_config().admin_import_chunk_size
+    rejected = 0
+
+    def reject(path: Path, line: int, detail: str) -> None:
+        nonlocal rejected
+        rejected += 1
+        if on_reject is not None:
+            on_reject(path, line, detail)
+
+    with get_db_engine().connect() as connection:
+        dbapi_connection = connection.connection
+        driver_connection = dbapi_connection.driver_connection
+        try:
+            with driver_connection.cursor() as cursor:
+                cursor.execute(CREATE_STAGING_TABLE_QUERY)
+                with cursor.copy(COPY_STAGING_TABLE_QUERY) as copy:
+                    for row in _get_staging_rows(paths, import_format, chunk_size, reject):
+                        copy.write_row(row)
+                cursor.execute(ANALYZE_STAGING_TABLE_QUERY)
+                cursor.execute(INSERT_ORDERS_QUERY, (OrderStatus.PENDING.name,))
+                accepted = cursor.rowcount
+            # skipped rows are read through a server-side cursor, there may be as many as accepted ones
+            with driver_connection.cursor(name=f"{STAGING_TABLE}_skipped") as cursor:
+                cursor.itersize = chunk_size
+                cursor.execute(SKIPPED_ROWS_QUERY)
+                for source, line in cursor:
+                    reject(paths[source], line, OrderRejectionReason.PHONE_NUMBER_ALREADY_REGISTERED.description)
+            dbapi_connection.commit()
+            if phone_number_reservations:
+                # the imported orders own their phone numbers, like orders committed by a worker
+                with driver_connection.cursor(name=f"{STAGING_TABLE}_imported") as cursor:
+                    cursor.itersize = chunk_size
+                    cursor.execute(IMPORTED_ROWS_QUERY)
+                    for rows in batched(cursor, chunk_size):
+                        phone_number_reservations.confirm({
+                            phone_number: str(order_id)
+                            for phone_number, order_id in rows
+                        })
+                dbapi_connection.commit()
+        except Exception:
+            dbapi_connection.rollback()
+            raise
+        finally:
+            # the connection goes back to the pool, the staging table must not outlive the import
+            if not driver_connection.broken:
+                with driver_connection.cursor() as cursor:
+                    cursor.execute(DROP_STAGING_TABLE_QUERY)
+                dbapi_connection.commit()
+    return accepted, rejected
+
@@ -0,0 +1,173 @@
+import typing as t
+from datetime import datetime
+from importlib.util import find_spec
+
+from sqlalchemy import Select, select
+from sqlalchemy.dialects import postgresql
+
+from ...config import get_config
+from ...enums import ExportFormat
+from ..base import (
+    AsyncDBSession,
+    DBSession,
+    get_async_db_engine,
+    get_db_engine,
+)
+from ..enums import OrderStatus
+from ..models import Order
+
+__all__ = (
+    "check_export_format",
+    "EXPORT_MEDIA_TYPES",
+    "export_orders",
+    "export_orders_async",
+    "get_orders_export_query",
+)
+
+EXPORT_COLUMNS = (
+    Order.id,
+    Order.user_name,
+    Order.phone_number,
+    Order.status,
+    Order.notes,
+    Order.created,
+)
+EXPORT_MEDIA_TYPES = {
+    ExportFormat.CSV: "text/csv",
+    ExportFormat.PARQUET: "application/vnd.apache.parquet",
+}
+
+
+def check_export_format(export_format: ExportFormat) -> None:
+    # parquet is encoded by `pyarrow`, an optional dependency, the choice is rejected before the export starts
+    if export_format == ExportFormat.PARQUET and find_spec("pyarrow") is None:
+        raise RuntimeError("Parquet export requires the `pyarrow` package, install the `parquet` extra")
+
+
+def get_orders_export_query(
+    status: OrderStatus | None = None,
+    created_from: datetime | None = None,
+    created_to: datetime | None = None,
+) -> Select:
+    # in (created, id) order, read from `ix_orders_created_id` without sorting the table
+    stmt = select(*EXPORT_COLUMNS).order_by(Order.created, Order.id)
+    if status is not None:
+        stmt = stmt.where(Order.status == status)
+    if created_from is not None:
+        stmt = stmt.where(Order.created >= created_from)
+    if created_to is not None:
+        stmt = stmt.where(Order.created < created_to)
+    return stmt
+
+
+def _get_copy_sql(stmt: Select) -> str:
+    # the rows are encoded to CSV by Postgres and streamed back in chunks, parameters are inlined as COPY takes none
+    sql = stmt.compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True})
+    return f"COPY ({sql}) TO STDOUT WITH (FORMAT CSV, HEADER)"
+
+
+class _ParquetEncoder:
+    # pyarrow writes the file sequentially into this sink, one row group per chunk of rows,
+    # the bytes written so far are handed over after every chunk so the file is never held in memory
+    closed = False
+
+    def __init__(self) -> None:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        self._pa = pa
+        self._schema = pa.schema([
+            ("id", pa.string()),
+            ("user_name", pa.string()),
+            ("phone_number", pa.string()),
+            ("status", pa.string()),
+            ("notes", pa.string()),
+            ("created", pa.timestamp("us", tz="UTC")),
+        ])
+        self._buffer = bytearray()
+        self._position = 0
+        self._writer = pq.ParquetWriter(pa.PythonFile(self, mode="w"), self._schema)
+
+    def write(self, data: bytes) -> int:
+        self._buffer += data
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def flush(self) -> None:
+        pass
+
+    def encode(self, rows: t.Sequence[t.Any]) -> bytes:
+        self._writer.write_batch(self._pa.record_batch(
+            [
+                [str(row.id) for row in rows],
+                [row.user_name for row in rows],
+                [row.phone_number for row in rows],
+                [row.status.value for row in rows],
+                [row.notes for row in rows],
+                [row.created for row in rows],
+            ],
+            schema=self._schema,
+        ))
+        return self._take()
+
+    def close(self) -> bytes:
+        self._writer.close()
+        return self._take()
+
+    def _take(self) -> bytes:
+        data = bytes(self._buffer)
+        self._buffer.clear()
+        return data
+
+
+def _export_orders_csv(stmt: Select) -> t.Iterator[bytes]:
+    with get_db_engine().connect() as connection:
+        with connection.connection.driver_connection.cursor() as cursor:
+            with cursor.copy(_get_copy_sql(stmt)) as copy:
+                for data in copy:
+                    yield bytes(data)
+
+
+def _export_orders_parquet(stmt: Select, encoder: _ParquetEncoder) -> t.Iterator[bytes]:
+    # `yield_per` reads the rows through a server-side cursor, one chunk at a time
+    with DBSession() as session:
+        result = session.execute(stmt.execution_options(yield_per=get_config().admin_export_chunk_size))
+        for rows in result.partitions():
+            yield encoder.encode(rows)
+    yield encoder.close()
+
+
+async def _export_orders_csv_async(stmt: Select) -> t.AsyncIterator[bytes]:
+    async with get_async_db_engine().connect() as connection:
+        raw_connection = await connection.get_raw_connection()
+        async with raw_connection.driver_connection.cursor() as cursor:
+            async with cursor.copy(_get_copy_sql(stmt)) as copy:
+                async for data in copy:
+                    yield bytes(data)
+
+
+async def _export_orders_parquet_async(stmt: Select, encoder: _ParquetEncoder) -> t.AsyncIterator[bytes]:
+    async with AsyncDBSession() as session:
+        result = await session.stream(stmt.execution_options(yield_per=get_config().admin_export_chunk_size))
+        async for rows in result.partitions():
+            yield encoder.encode(rows)
+    yield encoder.close()
+
+
+def export_orders(export_format: ExportFormat, stmt: Select) -> t.Iterator[bytes]:
+    match export_format:
+        case ExportFormat.CSV:
+            return _export_orders_csv(stmt)
+        case ExportFormat.PARQUET:
+            return _export_orders_parquet(stmt, _ParquetEncoder())
+
+
+def export_orders_async(export_format: ExportFormat, stmt: Select) -> t.AsyncIterator[bytes]:
+    match export_format:
+        case ExportFormat.CSV:
+            return _export_orders_csv_async(stmt)
+        case ExportFormat.PARQUET:
+            return _export_orders_parquet_async(stmt, _ParquetEncoder())
@@ -1,21 +1,140 @@
+import asyncio
 import logging
+import time
+import typing as t
+import uuid
+from datetime import datetime
+from functools import cache
 
-from sqlalchemy import delete
+from sqlalchemy import (
+    any_,
+    bindparam,
+    delete,
+    Row,
+    select,
+    tuple_,
+)
+from sqlalchemy.dialects.postgresql import ARRAY, UUID
 
-from ..base import DBSession
+from ...config import get_config
+from ..base import AsyncDBSession, DBSession
+from ..enums import OrderStatus
 from ..models import Order
 
-__all__ = ("delete_all_orders",)
+__all__ = (
+    "delete_all_orders",
+    "get_existing_order_ids",
+    "get_order_ids_loader",
+    "OrderIdsLoader",
+    "purge_orders",
+)
 
 logger = logging.getLogger(__name__)
 
 
-def delete_all_orders() -> None:
-    with DBSession() as session:
-        try:
-            session.execute(delete(Order))
-            session.commit()
-        except Exception as e:
-            session.rollback()
-            logger.error(f"An error occurred: {e}", stack_info=True)
-            raise
+def delete_all_orders(on_batch: t.Callable[[list[Row]], None] | None = None) -> int:
+    return purge_orders(on_batch=on_batch)
+
+
+def purge_orders(
+    created_before: datetime | None = None,
+    status: OrderStatus | None = None,
+    after: tuple[datetime, uuid.UUID] | None = None,
+    on_batch: t.Callable[[list[Row]], None] | None = None,
+) -> int:
+    # oldest first, in batches of `admin_purge_batch_size` orders deleted by primary key, each in its own short
+    # transaction followed by a pause, so locks, replication lag and dead tuples stay bounded,
+    # `after` resumes from the (created, id) key of the last deleted order, see `on_batch`
+    config = get_config()
+    batch_sleep = config.admin_purge_batch_sleep / 1000
+    ids_stmt = select(Order.id).order_by(Order.created, Order.id).limit(config.admin_purge_batch_size)
+    if created_before is not None:
+        ids_stmt = ids_stmt.where(Order.created < created_before)
+    if status is not None:
+        ids_stmt = ids_stmt.where(Order.status == status)
+    count = 0
+    while True:
+        stmt = ids_stmt
+        if after is not None:
+            # rows skipped by the filters are not scanned again by the next batches
+            stmt = stmt.where(tuple_(Order.created, Order.id) > tuple_(*after))
+        with DBSession() as session:
+            try:
+                rows = list(session.execute(
+                    delete(Order)
+                    .where(Order.id.in_(stmt))
+                    .returning(Order.id, Order.phone_number, Order.created)
+                    .execution_options(synchronize_session=False)
+                ))
+                session.commit()
+            except Exception as e:
+                session.rollback()
+                logger.error(f"An error occurred: {e}", stack_info=True)
+                raise
+        if not rows:
+            return count
+        count += len(rows)
+        after = max((row.created, row.id) for row in rows)
+        if on_batch is not None:
+            on_batch(rows)
+        time.sleep(batch_sleep)
+
+
+async def get_existing_order_ids(order_ids: list[uuid.UUID]) -> set[uuid.UUID]:
+    async with AsyncDBSession() as session:
+        result = await session.scalars(
+            select(Order.id).where(
+                Order.id == any_(bindparam("ids", order_ids, type_=ARRAY(UUID(as_uuid=True))))
+            )
+        )
+        return set(result)
+
+
+class OrderIdsLoader:
+    # coalesces concurrent lookups into a single `WHERE id = ANY(:ids)` query per batch
+    _flush_task: asyncio.Task | None
+    _pending: dict[uuid.UUID, list[asyncio.Future[bool]]]
+    batch_max_size: int
+    batch_wait: float
+
+    def __init__(self, batch_wait: float, batch_max_size: int) -> None:
+        self._flush_task = None
+        self._pending = {}
+        self.batch_max_size = batch_max_size
+        self.batch_wait = batch_wait
+
+    async def exists(self, order_id: uuid.UUID) -> bool:
+        future: asyncio.Future[bool] = asyncio.get_running_loop().create_future()
+        self._pending.setdefault(order_id, []).append(future)
+        if self._flush_task is None:
+            self._flush_task = asyncio.create_task(self._flush())
+        return await future
+
+    async def _flush(self) -> None:
+        await asyncio.sleep(self.batch_wait)
+        pending, self._pending, self._flush_task = self._pending, {}, None
+        order_ids = list(pending)
+        for i in range(0, len(order_ids), self.batch_max_size):
+            batch = order_ids[i:i + self.batch_max_size]
+            try:
+                existing_order_ids = await get_existing_order_ids(batch)
+            except Exception as e:
+                # the error is reported by every waiter
+                for order_id in batch:
+                    for future in pending[order_id]:
+                        if not future.done():
+                            future.set_exception(e)
+                continue
+            for order_id in batch:
+                for future in pending[order_id]:
+                    if not future.done():
+                        future.set_result(order_id in existing_order_ids)
+
+
+@cache
+def get_order_ids_loader() -> OrderIdsLoader:
+    config = get_config()
+    return OrderIdsLoader(
+        config.api_order_status_db_batch_wait / 1000,
+        config.api_order_status_db_batch_max_size,
+    )
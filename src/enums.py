@@ -4,8 +4,12 @@ import typing as t
 __all__ = (
     "BaseEnum",
     "Environment",
+    "ExportFormat",
+    "ImportFormat",
     "OrderProcessingStatus",
+    "OrderRejectionReason",
     "OrderStatus",
+    "TracingExporter",
 )
 
 
@@ -29,6 +33,16 @@ class Environment(str, BaseEnum):
     PRODUCTION = "PRODUCTION"
 
 
+class ExportFormat(str, BaseEnum):
+    CSV = "csv"
+    PARQUET = "parquet"
+
+
+class ImportFormat(str, BaseEnum):
+    CSV = "csv"
+    JSONL = "jsonl"
+
+
 class OrderStatus(str, BaseEnum):
     ACCEPTED = "ACCEPTED"
     ERROR = "ERROR"
@@ -51,3 +65,34 @@ class OrderStatus(str, BaseEnum):
 class OrderProcessingStatus(str, BaseEnum):
     ACCEPTED = "ACCEPTED"
     REJECTED = "REJECTED"
+
+
+# members are encoded by position in the order status store, new members must only be appended
+class OrderRejectionReason(str, BaseEnum):
+    USER_NAME_INVALID_CHARACTERS = "USER_NAME_INVALID_CHARACTERS"
+    PHONE_NUMBER_INVALID_CHARACTERS = "PHONE_NUMBER_INVALID_CHARACTERS"
+    PHONE_NUMBER_INVALID_LENGTH = "PHONE_NUMBER_INVALID_LENGTH"
+    PHONE_NUMBER_INVALID = "PHONE_NUMBER_INVALID"
+    PHONE_NUMBER_INVALID_FORMAT = "PHONE_NUMBER_INVALID_FORMAT"
+    PHONE_NUMBER_ALREADY_REGISTERED = "PHONE_NUMBER_ALREADY_REGISTERED"
+
+    @property
+    def description(self) -> str:
+        match self:
+            case self.USER_NAME_INVALID_CHARACTERS:
+                return "User name contains invalid characters"
+            case self.PHONE_NUMBER_INVALID_CHARACTERS:
+                return "Phone number contains invalid characters"
+            case self.PHONE_NUMBER_INVALID_LENGTH:
+                return "Phone number must contain between 7 and 15 digits"
+            case self.PHONE_NUMBER_INVALID:
+                return "Phone number is not valid"
+            case self.PHONE_NUMBER_INVALID_FORMAT:
+                return "Invalid phone number format"
+            case self.PHONE_NUMBER_ALREADY_REGISTERED:
+                return "Phone number is already registered"
+
+
+class TracingExporter(str, BaseEnum):
+    FILE = "FILE"
+    OTLP = "OTLP"
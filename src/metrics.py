@@ -0,0 +1,159 @@
+import os
+import time
+import typing as t
+
+from prometheus_client import (
+    CollectorRegistry,
+    CONTENT_TYPE_LATEST,
+    Counter,
+    Gauge,
+    generate_latest,
+    Histogram,
+    multiprocess,
+    REGISTRY,
+    start_http_server,
+)
+from prometheus_client.core import GaugeMetricFamily
+
+__all__ = (
+    "ADMISSION_QUEUE_SATURATION",
+    "ADMISSION_REJECTED_REQUESTS",
+    "CONTENT_TYPE_LATEST",
+    "generate_metrics",
+    "get_metrics_registry",
+    "HTTP_REQUEST_DURATION",
+    "MetricsMiddleware",
+    "observe_amortized",
+    "REDIS_COMMAND_DURATION",
+    "start_metrics_exporter",
+    "WORKER_DB_DURATION",
+    "WORKER_INTEGRITY_ERRORS",
+    "WORKER_JOB_DURATION",
+    "WORKER_ORDERS",
+    "WORKER_VALIDATION_DURATION",
+)
+
+# with `PROMETHEUS_MULTIPROC_DIR` set, every process writes its samples to mmap-ed files in that directory,
+# which are aggregated at scrape time, gunicorn workers and forked RQ workers are then reported together
+MULTIPROC_DIR_ENV = "PROMETHEUS_MULTIPROC_DIR"
+UNMATCHED_ROUTE = "other"
+
+ADMISSION_QUEUE_SATURATION = Gauge(
+    "final_price_admission_queue_saturation",
+    "Queue backlog relative to the closest admission limit, orders are shed at 1 and above",
+    multiprocess_mode="livemax",
+)
+ADMISSION_REJECTED_REQUESTS = Counter(
+    "final_price_admission_rejected_requests",
+    "Order requests rejected with 429 by the admission control",
+)
+HTTP_REQUEST_DURATION = Histogram(
+    "final_price_http_request_duration_seconds",
+    "HTTP request duration by route template",
+    ("method", "route", "status_code"),
+)
+REDIS_COMMAND_DURATION = Histogram(
+    "final_price_redis_command_duration_seconds",
+    "Redis command or pipeline round trip duration, as seen by the API",
+    ("command",),
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0),
+)
+WORKER_JOB_DURATION = Histogram(
+    "final_price_worker_job_duration_seconds",
+    "Job execution duration, batched jobs share the duration of their batch evenly",
+)
+_WORKER_STAGE_DURATION = Histogram(
+    "final_price_worker_stage_duration_seconds",
+    "Order processing duration by stage, batched orders share the duration of their batch evenly",
+    ("stage",),
+)
+WORKER_VALIDATION_DURATION = _WORKER_STAGE_DURATION.labels("validation")
+WORKER_DB_DURATION = _WORKER_STAGE_DURATION.labels("db")
+WORKER_ORDERS = Counter(
+    "final_price_worker_orders",
+    "Orders processed by final status",
+    ("status",),
+)
+WORKER_INTEGRITY_ERRORS = Counter(
+    "final_price_worker_integrity_errors",
+    "Orders rejected by the phone number unique constraint of the database",
+)
+
+_EXPORTER_STARTED = False
+
+
+def observe_amortized(histogram: t.Any, duration: float, count: int) -> None:
+    for _ in range(count):
+        histogram.observe(duration / count)
+
+
+def get_metrics_registry() -> CollectorRegistry:
+    if MULTIPROC_DIR_ENV not in os.environ:
+        return REGISTRY
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+    return registry
+
+
+class _QueueCollector:
+    # queue gauges are read from Redis at scrape time, they are never written on the hot path
+    def __init__(self, queue_name: str, size: int, oldest_job_age: float | None) -> None:
+        self._queue_name = queue_name
+        self._size = size
+        self._oldest_job_age = oldest_job_age
+
+    def collect(self) -> t.Iterator[GaugeMetricFamily]:
+        size = GaugeMetricFamily("final_price_queue_size", "Jobs waiting in the queue", labels=("queue",))
+        size.add_metric((self._queue_name,), self._size)
+        yield size
+        age = GaugeMetricFamily(
+            "final_price_queue_oldest_job_age_seconds",
+            "Time the oldest job has been waiting in the queue",
+            labels=("queue",),
+        )
+        age.add_metric((self._queue_name,), self._oldest_job_age or 0)
+        yield age
+
+
+def generate_metrics(queue_name: str, queue_size: int, queue_oldest_job_age: float | None) -> bytes:
+    queue_registry = CollectorRegistry(auto_describe=False)
+    queue_registry.register(_QueueCollector(queue_name, queue_size, queue_oldest_job_age))
+    return generate_latest(get_metrics_registry()) + generate_latest(queue_registry)
+
+
+def start_metrics_exporter(port: int) -> None:
+    # processes forked after the exporter has started inherit the flag, only the parent serves the metrics
+    global _EXPORTER_STARTED
+    if _EXPORTER_STARTED:
+        return
+    start_http_server(port, registry=get_metrics_registry())
+    _EXPORTER_STARTED = True
+
+
+class MetricsMiddleware:
+    # pure ASGI middleware, labelled by the route template so path parameters do not blow up cardinality
+    def __init__(self, app: t.Any) -> None:
+        self.app = app
+
+    async def __call__(self, scope: dict, receive: t.Callable, send: t.Callable) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        started_at = time.perf_counter()
+        status_code = 500
+
+        async def send_wrapper(message: dict) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = scope.get("route", None)
+            HTTP_REQUEST_DURATION.labels(
+                scope["method"],
+                route.path if route is not None else UNMATCHED_ROUTE,
+                str(status_code),
+            ).observe(time.perf_counter() - started_at)
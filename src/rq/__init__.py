@@ -1 +1,14 @@
-from .utils import get_rq_queue
+import typing as t
+
+__all__ = (
+    "get_async_rq_queue",
+    "get_order_status_listener",
+)
+
+
+def __getattr__(name: str) -> t.Any:
+    # the worker imports `src.rq.*` modules without loading the async Redis stack used by the API
+    if name in __all__:
+        from . import utils
+        return getattr(utils, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,104 @@
+import typing as t
+
+import redis.asyncio
+from rq.job import Job, JobStatus
+from rq.queue import EnqueueData, Queue
+from rq.utils import now
+
+from .serializers import ORJSONSerializer
+
+__all__ = ("AsyncQueue",)
+
+
+class AsyncQueue:
+    # writes the same job hashes and queue entries as `rq.Queue`, so jobs are picked up by regular RQ workers
+    connection: redis.asyncio.Redis
+    key: str
+    name: str
+    serializer: type[ORJSONSerializer]
+
+    prepare_data = staticmethod(Queue.prepare_data)
+
+    def __init__(
+        self,
+        name: str,
+        connection: redis.asyncio.Redis,
+        serializer: type[ORJSONSerializer] = ORJSONSerializer,
+    ) -> None:
+        self.name = name
+        self.key = f"{Queue.redis_queue_namespace_prefix}{name}"
+        self.connection = connection
+        self.serializer = serializer
+
+    def create_job(self, job_data: EnqueueData) -> Job:
+        if job_data.depends_on:
+            raise ValueError("Job dependencies are not supported")
+        # the job is only used to build the Redis hash, the async connection is never used by RQ itself
+        job = Job.create(
+            job_data.func,
+            args=job_data.args,
+            kwargs=job_data.kwargs,
+            connection=self.connection,
+            result_ttl=job_data.result_ttl,
+            ttl=job_data.ttl,
+            status=JobStatus.QUEUED,
+            description=job_data.description,
+            timeout=job_data.timeout or Queue.DEFAULT_TIMEOUT,
+            id=job_data.job_id,
+            origin=self.name,
+            meta=job_data.meta,
+            failure_ttl=job_data.failure_ttl,
+            serializer=self.serializer,
+        )
+        if job_data.retry:
+            job.retries_left = job_data.retry.max
+            job.retry_intervals = job_data.retry.intervals
+        job.enqueued_at = now()
+        return job
+
+    async def enqueue(
+        self,
+        f: t.Callable[..., t.Any],
+        *args: t.Any,
+        job_id: str | None = None,
+        job_timeout: int | None = None,
+        result_ttl: int | None = None,
+        failure_ttl: int | None = None,
+        ttl: int | None = None,
+        description: str | None = None,
+        meta: dict | None = None,
+        retry: t.Any | None = None,
+        at_front: bool = False,
+        **kwargs: t.Any,
+    ) -> Job:
+        job_data = self.prepare_data(
+            f,
+            args=args,
+            kwargs=kwargs,
+            timeout=job_timeout,
+            result_ttl=result_ttl,
+            ttl=ttl,
+            failure_ttl=failure_ttl,
+            description=description,
+            job_id=job_id,
+            at_front=at_front,
+            meta=meta,
+            retry=retry,
+        )
+        jobs = await self.enqueue_many([job_data])
+        return jobs[0]
+
+    async def enqueue_many(self, job_datas: t.Sequence[EnqueueData]) -> list[Job]:
+        jobs = [self.create_job(job_data) for job_data in job_datas]
+        async with self.connection.pipeline() as pipeline:
+            pipeline.sadd(Queue.redis_queues_keys, self.key)
+            for job, job_data in zip(jobs, job_datas):
+                pipeline.hset(job.key, mapping=job.to_dict())
+                if job.ttl:
+                    pipeline.expire(job.key, job.ttl)
+                if job_data.at_front:
+                    pipeline.lpush(self.key, job.id)
+                else:
+                    pipeline.rpush(self.key, job.id)
+            await pipeline.execute()
+        return jobs
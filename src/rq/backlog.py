@@ -0,0 +1,33 @@
+import typing as t
+
+import redis.asyncio
+from rq.job import Job
+from rq.utils import now, utcparse
+
+from .async_queue import AsyncQueue
+
+__all__ = ("get_size_and_oldest_job_age_async",)
+
+# the queue size and the enqueue time of its oldest job, in a single round trip
+QUEUE_BACKLOG_SCRIPT = """
+local oldest_job_id = redis.call('LINDEX', KEYS[1], 0)
+local enqueued_at = false
+if oldest_job_id then
+    enqueued_at = redis.call('HGET', ARGV[1] .. oldest_job_id, 'enqueued_at')
+end
+return {redis.call('LLEN', KEYS[1]), enqueued_at}
+"""
+
+
+def _parse_backlog(result: list[t.Any]) -> tuple[int, float | None]:
+    # the age is in seconds, `None` when the queue is empty
+    size, enqueued_at = result
+    if not enqueued_at:
+        return size, None
+    return size, (now() - utcparse(enqueued_at.decode())).total_seconds()
+
+
+async def get_size_and_oldest_job_age_async(queue: AsyncQueue) -> tuple[int, float | None]:
+    connection: redis.asyncio.Redis = queue.connection
+    script = connection.register_script(QUEUE_BACKLOG_SCRIPT)
+    return _parse_backlog(await script(keys=[queue.key], args=[Job.redis_job_namespace_prefix]))
@@ -0,0 +1,33 @@
+import time
+import typing as t
+
+import redis.asyncio
+from redis.asyncio.client import Pipeline
+
+from ..metrics import REDIS_COMMAND_DURATION
+
+__all__ = ("InstrumentedAsyncRedis",)
+
+PIPELINE_COMMAND = "PIPELINE"
+
+
+class InstrumentedAsyncPipeline(Pipeline):
+    async def execute(self, raise_on_error: bool = True) -> list[t.Any]:
+        started_at = time.perf_counter()
+        try:
+            return await super().execute(raise_on_error)
+        finally:
+            REDIS_COMMAND_DURATION.labels(PIPELINE_COMMAND).observe(time.perf_counter() - started_at)
+
+
+class InstrumentedAsyncRedis(redis.asyncio.Redis):
+    # times every round trip to Redis, a pipeline counts as a single one
+    async def execute_command(self, *args: t.Any, **options: t.Any) -> t.Any:
+        started_at = time.perf_counter()
+        try:
+            return await super().execute_command(*args, **options)
+        finally:
+            REDIS_COMMAND_DURATION.labels(str(args[0]).upper()).observe(time.perf_counter() - started_at)
+
+    def pipeline(self, transaction: bool = True, shard_hint: str | None = None) -> InstrumentedAsyncPipeline:
+        return InstrumentedAsyncPipeline(self.connection_pool, self.response_callbacks, transaction, shard_hint)
@@ -1,19 +1,55 @@
-from rq.job import Job
+from rq.job import Job, JobStatus
 from sqlalchemy.orm import Session
 
+from ..enums import OrderStatus
+from ..metrics import WORKER_ORDERS
+from .status import resolve_order_status
+from .reservations import PhoneNumberReservations
+from .status_store import pipeline_save_order_status
+
 __all__ = ("DBJob",)
 
 
 class DBJob(Job):
+    _batch_result: dict | None
     _db_session: Session | None
+    _phone_number_reservations: PhoneNumberReservations | None
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
+        self._batch_result = None
         self._db_session = None
+        self._phone_number_reservations = None
+
+    def attach_batch_result(self, batch_result: dict) -> None:
+        self._batch_result = batch_result
 
     def attach_db_session(self, db_session: Session) -> None:
         self._db_session = db_session
 
+    def attach_phone_number_reservations(self, phone_number_reservations: PhoneNumberReservations | None) -> None:
+        self._phone_number_reservations = phone_number_reservations
+
+    @property
+    def batch_result(self) -> dict | None:
+        return self._batch_result
+
     @property
     def db_session(self) -> Session:
         return self._db_session
+
+    @property
+    def phone_number_reservations(self) -> PhoneNumberReservations | None:
+        return self._phone_number_reservations
+
+    def _handle_success(self, result_ttl, pipeline, worker_name: str = ""):
+        super()._handle_success(result_ttl, pipeline, worker_name)
+        self._save_order_status(pipeline, *resolve_order_status(JobStatus.FINISHED, self._result))
+
+    def _handle_failure(self, exc_string: str, pipeline, worker_name: str = ""):
+        super()._handle_failure(exc_string, pipeline, worker_name)
+        self._save_order_status(pipeline, OrderStatus.ERROR, None)
+
+    def _save_order_status(self, pipeline, order_status: OrderStatus, detail: str | None) -> None:
+        pipeline_save_order_status(pipeline, self.id, order_status, detail)
+        WORKER_ORDERS.labels(order_status.value).inc()
@@ -0,0 +1,108 @@
+import asyncio
+import logging
+import typing as t
+from contextlib import contextmanager
+
+import redis.asyncio
+from redis.exceptions import RedisError
+
+from ..enums import OrderStatus
+from .status_store import (
+    decode_order_status,
+    decode_order_status_message,
+    get_order_status_key,
+    ORDER_STATUS_CHANNEL,
+)
+
+__all__ = ("OrderStatusListener",)
+
+logger = logging.getLogger(__name__)
+
+RECONNECT_INTERVAL = 1.0  # s.
+
+
+class OrderStatusListener:
+    # a single pub/sub subscription per process, terminal statuses published by workers
+    # are dispatched to the coroutines waiting for them
+    _connection: redis.asyncio.Redis
+    _task: asyncio.Task | None
+    _waiters: dict[str, set[asyncio.Future[tuple[OrderStatus, str | None]]]]
+
+    def __init__(self, connection: redis.asyncio.Redis) -> None:
+        self._connection = connection
+        self._task = None
+        self._waiters = {}
+
+    async def start(self) -> None:
+        pubsub = self._connection.pubsub(ignore_subscribe_messages=True)
+        await pubsub.subscribe(ORDER_STATUS_CHANNEL)
+        # called once the channel has been subscribed again, on every reconnection
+        pubsub.connection.register_connect_callback(self._on_reconnect)
+        self._task = asyncio.create_task(self._listen(pubsub))
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        for waiters in self._waiters.values():
+            for waiter in waiters:
+                waiter.cancel()
+        self._waiters.clear()
+
+    @contextmanager
+    def subscribe(self, order_id: str) -> t.Iterator[asyncio.Future[tuple[OrderStatus, str | None]]]:
+        waiter: asyncio.Future[tuple[OrderStatus, str | None]] = asyncio.get_running_loop().create_future()
+        self._waiters.setdefault(order_id, set()).add(waiter)
+        try:
+            yield waiter
+        finally:
+            waiters = self._waiters.get(order_id, None)
+            if waiters is not None:
+                waiters.discard(waiter)
+                if not waiters:
+                    del self._waiters[order_id]
+
+    async def _listen(self, pubsub: redis.asyncio.client.PubSub) -> None:
+        try:
+            while True:
+                try:
+                    async for message in pubsub.listen():
+                        if message["type"] == "message":
+                            self._dispatch(message["data"])
+                except RedisError as e:
+                    logger.error(f"Order status subscription failed: {e}")
+                    await asyncio.sleep(RECONNECT_INTERVAL)
+        finally:
+            await pubsub.aclose()
+
+    async def _on_reconnect(self, connection: redis.asyncio.Connection) -> None:
+        # statuses published while the subscription was down are lost, they are read from the status store instead
+        order_ids = list(self._waiters)
+        if not order_ids:
+            return
+        try:
+            values = await self._connection.mget([get_order_status_key(order_id) for order_id in order_ids])
+        except RedisError as e:
+            # the subscription reconnects again, which checks the waiters again
+            logger.error(f"Failed to check the status of {len(order_ids)} awaited orders: {e}")
+            return
+        for order_id, value in zip(order_ids, values):
+            if value is not None:
+                self._set_result(order_id, decode_order_status(value))
+
+    def _dispatch(self, message: bytes) -> None:
+        try:
+            order_id, order_status = decode_order_status_message(message)
+        except Exception as e:
+            logger.error(f"Invalid order status message {message!r}: {e}")
+            return
+        self._set_result(order_id, order_status)
+
+    def _set_result(self, order_id: str, order_status: tuple[OrderStatus, str | None]) -> None:
+        for waiter in self._waiters.pop(order_id, ()):
+            if not waiter.done():
+                waiter.set_result(order_status)
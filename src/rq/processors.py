@@ -1,67 +1,151 @@
+import asyncio
 import logging
 import re
+import time
 import typing as t
+import uuid
+from collections.abc import Sequence
+from functools import (
+    cache,
+    lru_cache,
+)
 
 import phonenumbers
 import regex
 from rq import get_current_job
 from rq.exceptions import InvalidJobOperation
+from sqlalchemy import (
+    Select,
+    select,
+)
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import (
+    async_sessionmaker,
+    AsyncSession,
+)
+from sqlalchemy.orm import Session
 
+from ..config import get_config
 from ..db.models import Order
-from ..enums import OrderProcessingStatus
+from ..enums import (
+    OrderProcessingStatus,
+    OrderRejectionReason,
+)
+from ..metrics import (
+    observe_amortized,
+    WORKER_DB_DURATION,
+    WORKER_INTEGRITY_ERRORS,
+    WORKER_VALIDATION_DURATION,
+)
 from ..rq.job import DBJob
+from ..tracing import start_span
+from .reservations import PhoneNumberReservations
 
-__all__ = ("process_order",)
+__all__ = (
+    "get_phone_number_cache_info",
+    "get_phone_number_digits",
+    "normalize_phone_number",
+    "OrderValidationResults",
+    "process_order",
+    "process_orders",
+    "process_orders_async",
+    "validate_order",
+    "validate_orders",
+)
 
 logger = logging.getLogger(__name__)
 
-PHONE_NUMBER_NON_DIGITS_RE_PATTERN = re.compile(r"\D")
 PHONE_NUMBER_RE_PATTERN = re.compile(r"^\+?[\d() -]+$")
+# the only non-digit characters allowed by `PHONE_NUMBER_RE_PATTERN`
+PHONE_NUMBER_SEPARATORS = "+() -"
 USER_NAME_RE_PATTERN = regex.compile(r"^[\p{L} '’-]+$")
 WHITESPACES_RE_PATTERN = re.compile(r"\s+")
 
+# rejections are shared constants, so validation does not allocate a result per call
+USER_NAME_INVALID_CHARACTERS = False, OrderRejectionReason.USER_NAME_INVALID_CHARACTERS.description, None
+PHONE_NUMBER_INVALID_CHARACTERS = False, OrderRejectionReason.PHONE_NUMBER_INVALID_CHARACTERS.description, None
+PHONE_NUMBER_INVALID_LENGTH = False, OrderRejectionReason.PHONE_NUMBER_INVALID_LENGTH.description, None
+PHONE_NUMBER_INVALID = False, OrderRejectionReason.PHONE_NUMBER_INVALID.description, None
+PHONE_NUMBER_INVALID_FORMAT = False, OrderRejectionReason.PHONE_NUMBER_INVALID_FORMAT.description, None
+# rejections of `validate_orders` by detail, shared between items, they must not be mutated
+REJECTIONS: dict[str, dict] = {
+    reason.description: {"status": OrderProcessingStatus.REJECTED, "detail": reason.description}
+    for reason in OrderRejectionReason
+}
+
 
 def _validate_user_name(user_name: str) -> tuple[bool, str | None, str | None]:
     user_name = WHITESPACES_RE_PATTERN.sub(" ", user_name.strip())
     if not USER_NAME_RE_PATTERN.match(user_name):
-        return False, "User name contains invalid characters", None
+        return USER_NAME_INVALID_CHARACTERS
     return True, None, user_name
 
 
+def _parse_phone_number(phone_number: str) -> tuple[bool, str | None, str | None]:
+    if not phone_number.startswith("+"):
+        phone_number = f"+{phone_number}"
+    try:
+        phone_obj = phonenumbers.parse(phone_number)
+    except phonenumbers.NumberParseException:
+        return PHONE_NUMBER_INVALID_FORMAT
+    if not (
+            phonenumbers.is_possible_number(phone_obj)
+            and phonenumbers.is_valid_number(phone_obj)
+    ):
+        return PHONE_NUMBER_INVALID
+    normalized = phonenumbers.format_number(
+        phone_obj,
+        phonenumbers.PhoneNumberFormat.E164,
+    )
+    return True, None, normalized
+
+
+@cache
+def _get_phone_number_parser() -> t.Callable[[str], tuple[bool, str | None, str | None]]:
+    # libphonenumber results are memoized per process, keyed by the whitespace-normalized input
+    return lru_cache(maxsize=get_config().validation_phone_number_cache_size)(_parse_phone_number)
+
+
+def get_phone_number_cache_info() -> t.Any:
+    # the `functools` cache info named tuple, (hits, misses, maxsize, currsize)
+    return _get_phone_number_parser().cache_info()
+
+
 def _validate_phone_number(phone_number: str) -> tuple[bool, str | None, str | None]:
     try:
         phone_number = WHITESPACES_RE_PATTERN.sub(" ", phone_number.strip())
+        # malformed input is rejected before it reaches libphonenumber or the memo
         if not PHONE_NUMBER_RE_PATTERN.match(phone_number):
-            return False, "Phone number contains invalid characters", None
-        phone_digits = PHONE_NUMBER_NON_DIGITS_RE_PATTERN.sub("", phone_number)
-        if not (7 <= len(phone_digits) <= 15):
-            return False, "Phone number must contain between 7 and 15 digits", None
-        if not phone_number.startswith("+"):
-            phone_number = f"+{phone_number}"
-        phone_obj = phonenumbers.parse(phone_number)
-        if not (
-                phonenumbers.is_possible_number(phone_obj)
-                and phonenumbers.is_valid_number(phone_obj)
-        ):
-            return False, "Phone number is not valid", None
-        normalized = phonenumbers.format_number(
-            phone_obj,
-            phonenumbers.PhoneNumberFormat.E164,
-        )
-        return True, None, normalized
-    except phonenumbers.NumberParseException:
-        return False, "Invalid phone number format", None
+            return PHONE_NUMBER_INVALID_CHARACTERS
+        phone_digits_count = len(phone_number) - sum(map(phone_number.count, PHONE_NUMBER_SEPARATORS))
+        if not (7 <= phone_digits_count <= 15):
+            return PHONE_NUMBER_INVALID_LENGTH
+        return _get_phone_number_parser()(phone_number)
     except Exception as e:
         logger.error(
             f"Unexpected error validating phone number: {e}",
             exc_info=True,
             extra={"phone_number": phone_number},
         )
-        return False, "Phone number is not valid", None
+        return PHONE_NUMBER_INVALID
+
 
+def normalize_phone_number(phone_number: str) -> str | None:
+    # the E.164 form persisted for a valid phone number
+    is_valid, _, normalized = _validate_phone_number(phone_number)
+    return normalized if is_valid else None
 
-def process_order(order: dict) -> dict:
+
+def get_phone_number_digits(phone_number: str) -> str | None:
+    # digits of a possibly partial phone number, with the characters accepted by `_validate_phone_number`
+    phone_number = WHITESPACES_RE_PATTERN.sub(" ", phone_number.strip())
+    if not PHONE_NUMBER_RE_PATTERN.match(phone_number):
+        return None
+    return "".join(filter(str.isdigit, phone_number)) or None
+
+
+def validate_order(order: dict) -> tuple[dict | None, dict[str, str]]:
     validators: list[tuple[str, t.Callable[[str], tuple[bool, str | None, str | None]]]] = [
         ("user_name", _validate_user_name),
         ("phone_number", _validate_phone_number),
@@ -70,25 +154,118 @@ def process_order(order: dict) -> dict:
     for field, validator in validators:
         is_valid, err_message, normalized_field = validator(order[field])
         if not is_valid:
-            return {"status": OrderProcessingStatus.REJECTED, "detail": err_message}
+            return {"status": OrderProcessingStatus.REJECTED, "detail": err_message}, normalized_fields
         normalized_fields[field] = normalized_field
+    return None, normalized_fields
+
+
+class OrderValidationResults(Sequence[tuple[dict | None, dict[str, str]]]):
+    # results of `validate_orders` by column, item `i` is what `validate_order` returns for the i-th order,
+    # nothing is allocated per item besides the normalized values, the tuples are only built on access
+    __slots__ = (
+        "phone_numbers",
+        "rejections",
+        "user_names",
+    )
+    phone_numbers: list[str | None]
+    rejections: list[dict | None]
+    user_names: list[str | None]
+
+    def __init__(self, size: int) -> None:
+        self.phone_numbers = [None] * size
+        self.rejections = [None] * size
+        self.user_names = [None] * size
+
+    def __len__(self) -> int:
+        return len(self.rejections)
+
+    def __getitem__(self, index: int) -> tuple[dict | None, dict[str, str]]:
+        normalized_fields: dict[str, str] = {}
+        if (user_name := self.user_names[index]) is not None:
+            normalized_fields["user_name"] = user_name
+        if (phone_number := self.phone_numbers[index]) is not None:
+            normalized_fields["phone_number"] = phone_number
+        return self.rejections[index], normalized_fields
+
+
+def validate_orders(orders: list[dict]) -> OrderValidationResults:
+    # same results as `validate_order` item by item, each distinct value of a field is validated once per batch
+    result = OrderValidationResults(len(orders))
+    rejections, user_names, phone_numbers = result.rejections, result.user_names, result.phone_numbers
+    user_name_results: dict[str, tuple[bool, str | None, str | None]] = {}
+    phone_number_results: dict[str, tuple[bool, str | None, str | None]] = {}
+    for index, order in enumerate(orders):
+        user_name = order["user_name"]
+        if (user_name_result := user_name_results.get(user_name, None)) is None:
+            user_name_result = user_name_results[user_name] = _validate_user_name(user_name)
+        is_valid, err_message, normalized_field = user_name_result
+        if not is_valid:
+            rejections[index] = REJECTIONS[err_message]
+            continue
+        user_names[index] = normalized_field
+        phone_number = order["phone_number"]
+        if (phone_number_result := phone_number_results.get(phone_number, None)) is None:
+            phone_number_result = phone_number_results[phone_number] = _validate_phone_number(phone_number)
+        is_valid, err_message, normalized_field = phone_number_result
+        if not is_valid:
+            rejections[index] = REJECTIONS[err_message]
+            continue
+        phone_numbers[index] = normalized_field
+    return result
+
+
+def process_order(order: dict, validated: bool = False) -> dict:
     rq_job: DBJob = get_current_job()
+    if rq_job and rq_job.batch_result is not None:
+        # the order has already been processed as part of a batch by the worker
+        return rq_job.batch_result
+    if validated:
+        # the order has been validated and normalized by the API before being enqueued
+        rejection, normalized_fields = None, order
+    else:
+        started_at = time.perf_counter()
+        with start_span("validate_order"):
+            rejection, normalized_fields = validate_order(order)
+        WORKER_VALIDATION_DURATION.observe(time.perf_counter() - started_at)
+    if rejection:
+        return rejection
     if not rq_job:
         raise InvalidJobOperation("No job context found")
+    phone_number_reservations = rq_job.phone_number_reservations
+    reservation = {normalized_fields["phone_number"]: rq_job.id}
     _db_session = rq_job.db_session
+    if phone_number_reservations:
+        with start_span("reserve_phone_number"):
+            owners = _check_reservation_owners(
+                _db_session,
+                phone_number_reservations,
+                reservation,
+                phone_number_reservations.reserve(reservation),
+            )
+        if owners != reservation:
+            # registered by another order, the INSERT would fail on the unique constraint
+            return {
+                "status": OrderProcessingStatus.REJECTED,
+                "detail": OrderRejectionReason.PHONE_NUMBER_ALREADY_REGISTERED.description,
+            }
+    started_at = time.perf_counter()
     try:
         new_order = Order(
             id=rq_job.id,
             user_name=normalized_fields["user_name"],
             phone_number=normalized_fields["phone_number"],
         )
-        _db_session.add(new_order)
-        _db_session.commit()
+        with start_span("insert_order"):
+            _db_session.add(new_order)
+            _db_session.commit()
     except IntegrityError:
         _db_session.rollback()
+        WORKER_INTEGRITY_ERRORS.inc()
+        if phone_number_reservations:
+            _hand_over_reservations(_db_session, phone_number_reservations, reservation)
         return {
             "status": OrderProcessingStatus.REJECTED,
-            "detail": "Phone number is already registered",
+            "detail": OrderRejectionReason.PHONE_NUMBER_ALREADY_REGISTERED.description,
         }
     except Exception as e:
         logger.error(
@@ -96,5 +273,313 @@ def process_order(order: dict) -> dict:
             exc_info=True,
         )
         _db_session.rollback()
+        if phone_number_reservations:
+            phone_number_reservations.release(reservation)
+        raise e
+    finally:
+        WORKER_DB_DURATION.observe(time.perf_counter() - started_at)
+    if phone_number_reservations:
+        phone_number_reservations.confirm(reservation)
+    return {"status": OrderProcessingStatus.ACCEPTED}
+
+
+def _get_phone_number_owners_query(phone_numbers: t.Iterable[str]) -> Select[tuple[str, uuid.UUID]]:
+    return select(Order.phone_number, Order.id).where(Order.phone_number.in_(phone_numbers))
+
+
+def _split_reservations(
+    reservations: dict[str, str],
+    rows: t.Iterable[tuple[str, uuid.UUID]],
+) -> tuple[dict[str, str], dict[str, str]]:
+    # the (phone number, id) rows of the persisted orders owning the reserved phone numbers,
+    # returns their owners and the reservations left without any
+    owners = {phone_number: str(order_id) for phone_number, order_id in rows}
+    return owners, {
+        phone_number: order_id
+        for phone_number, order_id in reservations.items()
+        if phone_number not in owners
+    }
+
+
+def _take_over_reservations(
+    phone_number_reservations: PhoneNumberReservations,
+    reservations: dict[str, str],
+    owners: dict[str, str],
+    conflicts: dict[str, str],
+    rows: t.Iterable[tuple[str, uuid.UUID]],
+) -> dict[str, str]:
+    # the (phone number, id) rows of the persisted orders holding the conflicting phone numbers, reservations of
+    # other orders that no longer hold their phone number, after an edit in the admin for instance, are taken over
+    persisted, stale = _split_reservations(conflicts, rows)
+    phone_number_reservations.confirm({
+        phone_number: order_id
+        for phone_number, order_id in persisted.items()
+        if order_id != conflicts[phone_number]
+    })
+    taken_over = phone_number_reservations.take_over(
+        stale,
+        {phone_number: reservations[phone_number] for phone_number in stale},
+    )
+    return {**owners, **persisted, **taken_over}
+
+
+def _get_reservation_conflicts(reservations: dict[str, str], owners: dict[str, str]) -> dict[str, str]:
+    # phone number -> id of the other order owning its reservation
+    return {
+        phone_number: owner
+        for phone_number, owner in owners.items()
+        if owner != reservations[phone_number]
+    }
+
+
+def _check_reservation_owners(
+    db_session: Session,
+    phone_number_reservations: PhoneNumberReservations,
+    reservations: dict[str, str],
+    owners: dict[str, str],
+) -> dict[str, str]:
+    # the owners returned by `PhoneNumberReservations.reserve`, a reservation only stands once Postgres confirms
+    # that its owner holds the phone number
+    if not (conflicts := _get_reservation_conflicts(reservations, owners)):
+        return owners
+    try:
+        rows = db_session.execute(_get_phone_number_owners_query(conflicts)).tuples().all()
+    finally:
+        db_session.rollback()
+    return _take_over_reservations(phone_number_reservations, reservations, owners, conflicts, rows)
+
+
+async def _check_reservation_owners_async(
+    db_sessionmaker: async_sessionmaker[AsyncSession],
+    phone_number_reservations: PhoneNumberReservations,
+    reservations: dict[str, str],
+    owners: dict[str, str],
+) -> dict[str, str]:
+    if not (conflicts := _get_reservation_conflicts(reservations, owners)):
+        return owners
+    async with db_sessionmaker() as db_session:
+        rows = (await db_session.execute(_get_phone_number_owners_query(conflicts))).tuples().all()
+    return _take_over_reservations(phone_number_reservations, reservations, owners, conflicts, rows)
+
+
+def _hand_over_reservations(
+    db_session: Session,
+    phone_number_reservations: PhoneNumberReservations,
+    reservations: dict[str, str],
+) -> None:
+    # phone numbers rejected by the unique constraint belong to persisted orders, which take their reservations over
+    try:
+        owners, unowned = _split_reservations(
+            reservations,
+            db_session.execute(_get_phone_number_owners_query(reservations)).tuples(),
+        )
+    except Exception as e:
+        # the pending reservations expire instead
+        logger.error(f"Failed to hand over {len(reservations)} phone number reservations: {e}")
+        return
+    finally:
+        db_session.rollback()
+    phone_number_reservations.confirm(owners)
+    phone_number_reservations.release(unowned)
+
+
+async def _hand_over_reservations_async(
+    db_sessionmaker: async_sessionmaker[AsyncSession],
+    phone_number_reservations: PhoneNumberReservations,
+    reservations: dict[str, str],
+) -> None:
+    try:
+        async with db_sessionmaker() as db_session:
+            owners, unowned = _split_reservations(
+                reservations,
+                (await db_session.execute(_get_phone_number_owners_query(reservations))).tuples(),
+            )
+    except Exception as e:
+        logger.error(f"Failed to hand over {len(reservations)} phone number reservations: {e}")
+        return
+    phone_number_reservations.confirm(owners)
+    phone_number_reservations.release(unowned)
+
+
+def _prepare_orders_rows(
+    orders: dict[str, dict],
+    validated_order_ids: t.Container[str],
+) -> tuple[dict[str, dict], list[dict[str, t.Any]]]:
+    # rejections keyed by job id and rows to insert
+    result: dict[str, dict] = {}
+    rows: list[dict[str, t.Any]] = [
+        {"id": uuid.UUID(order_id), **order}
+        for order_id, order in orders.items()
+        if order_id in validated_order_ids
+    ]
+    unvalidated_orders = {
+        order_id: order
+        for order_id, order in orders.items()
+        if order_id not in validated_order_ids
+    }
+    started_at = time.perf_counter()
+    validation_results = validate_orders(list(unvalidated_orders.values()))
+    if unvalidated_orders:
+        observe_amortized(WORKER_VALIDATION_DURATION, time.perf_counter() - started_at, len(unvalidated_orders))
+    for index, order_id in enumerate(unvalidated_orders):
+        if rejection := validation_results.rejections[index]:
+            result[order_id] = rejection
+            continue
+        rows.append({
+            "id": uuid.UUID(order_id),
+            "user_name": validation_results.user_names[index],
+            "phone_number": validation_results.phone_numbers[index],
+        })
+    return result, rows
+
+
+def _get_rows_reservations(rows: list[dict[str, t.Any]]) -> dict[str, str]:
+    # the first row of a phone number reserves it
+    reservations: dict[str, str] = {}
+    for row in rows:
+        reservations.setdefault(row["phone_number"], str(row["id"]))
+    return reservations
+
+
+def _get_reserved_rows(
+    result: dict[str, dict],
+    rows: list[dict[str, t.Any]],
+    owners: dict[str, str],
+) -> list[dict[str, t.Any]]:
+    # rows of phone numbers registered by other orders are rejected into `result`
+    reserved_rows: list[dict[str, t.Any]] = []
+    for row in rows:
+        if owners[row["phone_number"]] == str(row["id"]):
+            reserved_rows.append(row)
+        else:
+            # the INSERT would fail on the unique constraint anyway
+            result[str(row["id"])] = {
+                "status": OrderProcessingStatus.REJECTED,
+                "detail": OrderRejectionReason.PHONE_NUMBER_ALREADY_REGISTERED.description,
+            }
+    return reserved_rows
+
+
+def process_orders(
+    db_session: Session,
+    orders: dict[str, dict],
+    validated_order_ids: t.Container[str] = (),
+    phone_number_reservations: PhoneNumberReservations | None = None,
+) -> dict[str, dict]:
+    # orders are keyed by job id, accepted ones are persisted with a single multi-row INSERT
+    result, rows = _prepare_orders_rows(orders, validated_order_ids)
+    reservations: dict[str, str] = {}
+    if phone_number_reservations and rows:
+        reservations = _get_rows_reservations(rows)
+        owners = _check_reservation_owners(
+            db_session,
+            phone_number_reservations,
+            reservations,
+            phone_number_reservations.reserve(reservations),
+        )
+        rows = _get_reserved_rows(result, rows, owners)
+    if not rows:
+        return result
+    started_at = time.perf_counter()
+    try:
+        inserted_ids: set[uuid.UUID] = set(
+            db_session.scalars(
+                insert(Order)
+                .values(rows)
+                .on_conflict_do_nothing(index_elements=[Order.phone_number])
+                .returning(Order.id)
+            )
+        )
+        db_session.commit()
+    except Exception as e:
+        logger.error(f"A database error occurred while creating orders batch: {e}", exc_info=True)
+        db_session.rollback()
+        if phone_number_reservations:
+            phone_number_reservations.release(reservations)
         raise e
+    finally:
+        observe_amortized(WORKER_DB_DURATION, time.perf_counter() - started_at, len(rows))
+    # rows skipped by ON CONFLICT are the batch counterpart of an IntegrityError
+    WORKER_INTEGRITY_ERRORS.inc(len(rows) - len(inserted_ids))
+    confirmed_reservations: dict[str, str] = {}
+    conflicting_reservations: dict[str, str] = {}
+    for row in rows:
+        if row["id"] in inserted_ids:
+            result[str(row["id"])] = {"status": OrderProcessingStatus.ACCEPTED}
+            confirmed_reservations[row["phone_number"]] = str(row["id"])
+        else:
+            result[str(row["id"])] = {
+                "status": OrderProcessingStatus.REJECTED,
+                "detail": OrderRejectionReason.PHONE_NUMBER_ALREADY_REGISTERED.description,
+            }
+            conflicting_reservations[row["phone_number"]] = str(row["id"])
+    if phone_number_reservations:
+        phone_number_reservations.confirm(confirmed_reservations)
+        if conflicting_reservations:
+            _hand_over_reservations(db_session, phone_number_reservations, conflicting_reservations)
+    return result
+
+
+async def _insert_order_async(db_sessionmaker: async_sessionmaker[AsyncSession], row: dict[str, t.Any]) -> dict:
+    started_at = time.perf_counter()
+    async with db_sessionmaker() as db_session:
+        try:
+            db_session.add(Order(**row))
+            await db_session.commit()
+        except IntegrityError:
+            await db_session.rollback()
+            WORKER_INTEGRITY_ERRORS.inc()
+            return {
+                "status": OrderProcessingStatus.REJECTED,
+                "detail": OrderRejectionReason.PHONE_NUMBER_ALREADY_REGISTERED.description,
+            }
+        finally:
+            WORKER_DB_DURATION.observe(time.perf_counter() - started_at)
     return {"status": OrderProcessingStatus.ACCEPTED}
+
+
+async def process_orders_async(
+    db_sessionmaker: async_sessionmaker[AsyncSession],
+    orders: dict[str, dict],
+    validated_order_ids: t.Container[str] = (),
+    phone_number_reservations: PhoneNumberReservations | None = None,
+) -> dict[str, dict]:
+    # orders are keyed by job id and inserted concurrently, each one on its own pooled connection;
+    # orders that failed with a database error are left out of the result
+    result, rows = _prepare_orders_rows(orders, validated_order_ids)
+    reservations: dict[str, str] = {}
+    if phone_number_reservations and rows:
+        reservations = _get_rows_reservations(rows)
+        owners = await _check_reservation_owners_async(
+            db_sessionmaker,
+            phone_number_reservations,
+            reservations,
+            phone_number_reservations.reserve(reservations),
+        )
+        rows = _get_reserved_rows(result, rows, owners)
+    insert_results = await asyncio.gather(
+        *(_insert_order_async(db_sessionmaker, row) for row in rows),
+        return_exceptions=True,
+    )
+    confirmed_reservations: dict[str, str] = {}
+    conflicting_reservations: dict[str, str] = {}
+    failed_reservations: dict[str, str] = {}
+    for row, insert_result in zip(rows, insert_results):
+        order_id = str(row["id"])
+        if isinstance(insert_result, Exception):
+            logger.error(f"A database error occurred while creating order for job {order_id}: {insert_result}")
+            if order_id == reservations.get(row["phone_number"], None):
+                failed_reservations[row["phone_number"]] = order_id
+            continue
+        result[order_id] = insert_result
+        if insert_result["status"] == OrderProcessingStatus.ACCEPTED:
+            confirmed_reservations[row["phone_number"]] = order_id
+        else:
+            # rejected by the unique constraint
+            conflicting_reservations[row["phone_number"]] = order_id
+    if phone_number_reservations:
+        phone_number_reservations.confirm(confirmed_reservations)
+        phone_number_reservations.release(failed_reservations)
+        if conflicting_reservations:
+            await _hand_over_reservations_async(db_sessionmaker, phone_number_reservations, conflicting_reservations)
+    return result
@@ -0,0 +1,177 @@
+import logging
+import typing as t
+
+import redis
+import redis.asyncio
+
+from ..config import get_config
+
+__all__ = ("PhoneNumberReservations",)
+
+logger = logging.getLogger(__name__)
+
+PHONE_NUMBER_RESERVATION_KEY_PREFIX = "final_price:phone_number:"
+PHONE_NUMBER_RESERVATIONS_SEEDED_KEY = "final_price:phone_numbers_seeded"
+PHONE_NUMBER_RESERVATIONS_SEEDING_KEY = "final_price:phone_numbers_seeding"
+PHONE_NUMBER_RESERVATIONS_SEEDING_TTL = 60 * 10  # 10 m.
+SEED_BATCH_SIZE = 10_000
+# reserves every free phone number until the last argument expires, in ms, and returns the owner of each one,
+# all in a single atomic call
+RESERVE_SCRIPT = """
+local ttl = ARGV[#ARGV]
+local owners = {}
+for i, key in ipairs(KEYS) do
+    local owner = redis.call('GET', key)
+    if not owner then
+        redis.call('SET', key, ARGV[i], 'PX', ttl)
+        owner = ARGV[i]
+    end
+    owners[i] = owner
+end
+return owners
+"""
+# takes over the reservations still owned by the given stale owners, or free, the same way as `RESERVE_SCRIPT`,
+# the arguments are the stale owners, the new owners and the ttl
+TAKE_OVER_SCRIPT = """
+local ttl = ARGV[#ARGV]
+local owners = {}
+for i, key in ipairs(KEYS) do
+    local owner = redis.call('GET', key)
+    if not owner or owner == ARGV[i] then
+        redis.call('SET', key, ARGV[#KEYS + i], 'PX', ttl)
+        owner = ARGV[#KEYS + i]
+    end
+    owners[i] = owner
+end
+return owners
+"""
+# releases reservations only if they are still owned by the given orders
+RELEASE_SCRIPT = """
+local released = 0
+for i, key in ipairs(KEYS) do
+    if redis.call('GET', key) == ARGV[i] then
+        released = released + redis.call('DEL', key)
+    end
+end
+return released
+"""
+
+
+class PhoneNumberReservations:
+    # normalized phone numbers reserved by order id, Postgres stays the source of truth for uniqueness, pending
+    # reservations expire unless confirmed once their orders are committed, `_async` methods need an asyncio client
+    _connection: redis.Redis | redis.asyncio.Redis
+    _ttl: int
+
+    def __init__(self, connection: redis.Redis | redis.asyncio.Redis) -> None:
+        self._connection = connection
+        self._ttl = get_config().rq_phone_number_reservation_ttl
+        self._reserve = connection.register_script(RESERVE_SCRIPT)
+        self._take_over = connection.register_script(TAKE_OVER_SCRIPT)
+        self._release = connection.register_script(RELEASE_SCRIPT)
+
+    @staticmethod
+    def get_key(phone_number: str) -> str:
+        return f"{PHONE_NUMBER_RESERVATION_KEY_PREFIX}{phone_number}"
+
+    def reserve(self, reservations: dict[str, str]) -> dict[str, str]:
+        # phone number -> order id, returns the order id owning each phone number
+        if not reservations:
+            return {}
+        owners = self._reserve(
+            keys=[self.get_key(phone_number) for phone_number in reservations],
+            args=[*reservations.values(), self._ttl * 1_000],
+        )
+        return self._get_owners(reservations, owners)
+
+    def take_over(self, stale_owners: dict[str, str], reservations: dict[str, str]) -> dict[str, str]:
+        # phone number -> order id owning a reservation it no longer holds, the reservations are taken over by
+        # the order ids of `reservations`, which has the same phone numbers, returns owners like `reserve`
+        if not reservations:
+            return {}
+        owners = self._take_over(
+            keys=[self.get_key(phone_number) for phone_number in reservations],
+            args=[
+                *(stale_owners[phone_number] for phone_number in reservations),
+                *reservations.values(),
+                self._ttl * 1_000,
+            ],
+        )
+        return self._get_owners(reservations, owners)
+
+    def confirm(self, owners: dict[str, str]) -> None:
+        # phone number -> id of the persisted order owning it, taking over whatever reservation is left
+        if not owners:
+            return
+        try:
+            self._connection.mset(self._get_mapping(owners))
+        except redis.RedisError as e:
+            # the pending reservations expire, the next conflict on the unique constraint confirms them again
+            logger.error(f"Failed to confirm {len(owners)} phone number reservations: {e}")
+
+    async def confirm_async(self, owners: dict[str, str]) -> None:
+        if not owners:
+            return
+        try:
+            await self._connection.mset(self._get_mapping(owners))
+        except redis.RedisError as e:
+            logger.error(f"Failed to confirm {len(owners)} phone number reservations: {e}")
+
+    def release(self, reservations: dict[str, str]) -> None:
+        if not reservations:
+            return
+        self._release(
+            keys=[self.get_key(phone_number) for phone_number in reservations],
+            args=list(reservations.values()),
+        )
+
+    async def release_async(self, reservations: dict[str, str]) -> None:
+        if not reservations:
+            return
+        await self._release(
+            keys=[self.get_key(phone_number) for phone_number in reservations],
+            args=list(reservations.values()),
+        )
+
+    def seed(self, rows: t.Iterable[tuple[t.Any, str]]) -> int:
+        # (order id, phone number) rows of persisted orders, only the first caller after a Redis reset seeds
+        if self._connection.exists(PHONE_NUMBER_RESERVATIONS_SEEDED_KEY):
+            return 0
+        if not self._connection.set(
+            PHONE_NUMBER_RESERVATIONS_SEEDING_KEY,
+            1,
+            nx=True,
+            ex=PHONE_NUMBER_RESERVATIONS_SEEDING_TTL,
+        ):
+            return 0
+        count = 0
+        try:
+            with self._connection.pipeline(transaction=False) as pipeline:
+                for order_id, phone_number in rows:
+                    pipeline.set(self.get_key(phone_number), str(order_id), nx=True)
+                    count += 1
+                    if count % SEED_BATCH_SIZE == 0:
+                        pipeline.execute()
+                pipeline.execute()
+            self._connection.set(PHONE_NUMBER_RESERVATIONS_SEEDED_KEY, 1)
+        finally:
+            # the next worker to start up seeds again unless all the rows have been seeded
+            self._connection.delete(PHONE_NUMBER_RESERVATIONS_SEEDING_KEY)
+        logger.info(f"Seeded {count} phone number reservations")
+        return count
+
+    def _get_mapping(self, owners: dict[str, str]) -> dict[str, str]:
+        return {self.get_key(phone_number): owner for phone_number, owner in owners.items()}
+
+    @staticmethod
+    def _get_owners(reservations: dict[str, str], owners: list[t.Any]) -> dict[str, str]:
+        return {
+            phone_number: owner.decode() if isinstance(owner, bytes) else owner
+            for phone_number, owner in zip(reservations, owners)
+        }
+
+    def clear(self) -> None:
+        keys = [PHONE_NUMBER_RESERVATIONS_SEEDED_KEY, PHONE_NUMBER_RESERVATIONS_SEEDING_KEY]
+        keys.extend(self._connection.scan_iter(match=f"{PHONE_NUMBER_RESERVATION_KEY_PREFIX}*", count=SEED_BATCH_SIZE))
+        for i in range(0, len(keys), SEED_BATCH_SIZE):
+            self._connection.delete(*keys[i:i + SEED_BATCH_SIZE])
@@ -0,0 +1,104 @@
+import typing as t
+
+import redis.asyncio
+from rq.job import Job, JobStatus
+from rq.results import Result
+from rq.utils import as_text
+
+from ..enums import (
+    OrderProcessingStatus,
+    OrderStatus,
+)
+from .serializers import ORJSONSerializer
+from .status_store import (
+    decode_order_status,
+    get_order_status_key,
+)
+
+__all__ = (
+    "fetch_order_status_async",
+    "fetch_order_statuses_async",
+    "parse_order_status",
+    "pipeline_order_status",
+    "resolve_order_status",
+)
+
+
+def resolve_order_status(
+    rq_job_status: JobStatus,
+    rq_job_return_value: dict | None,
+) -> tuple[OrderStatus, str | None]:
+    match rq_job_status:
+        case (
+            JobStatus.CREATED |
+            JobStatus.DEFERRED |
+            JobStatus.QUEUED |
+            JobStatus.SCHEDULED |
+            JobStatus.STARTED
+        ):
+            return OrderStatus.PROCESSING, None
+        case JobStatus.CANCELED | JobStatus.FAILED | JobStatus.STOPPED:
+            return OrderStatus.ERROR, None
+        case JobStatus.FINISHED:
+            if rq_job_return_value:
+                order_processing_status = rq_job_return_value.get("status", None)
+                if order_processing_status == OrderProcessingStatus.ACCEPTED:
+                    return OrderStatus.ACCEPTED, None
+                return OrderStatus.REJECTED, rq_job_return_value.get("detail", None)
+            return OrderStatus.REJECTED, None
+
+
+def pipeline_order_status(pipeline: t.Any, job_id: str) -> None:
+    # the terminal status record, the job status field and the latest result entry are read,
+    # the job hash is never loaded as a whole
+    pipeline.get(get_order_status_key(job_id))
+    pipeline.hget(Job.key_for(job_id), "status")
+    pipeline.xrevrange(Result.get_key(job_id), "+", "-", count=1)
+
+
+def parse_order_status(
+    job_id: str,
+    order_status: bytes | None,
+    job_status: bytes | None,
+    job_results: list[tuple[bytes, dict]] | None,
+    serializer: type[ORJSONSerializer] = ORJSONSerializer,
+) -> tuple[OrderStatus, str | None] | None:
+    if order_status:
+        return decode_order_status(order_status)
+    if not job_status:
+        return None
+    rq_job_status = JobStatus(as_text(job_status))
+    rq_job_return_value: t.Any | None = None
+    if rq_job_status == JobStatus.FINISHED and job_results:
+        result_id, payload = job_results[0]
+        result = Result.restore(job_id, as_text(result_id), payload, connection=None, serializer=serializer)
+        if result.type == Result.Type.SUCCESSFUL:
+            rq_job_return_value = result.return_value
+    return resolve_order_status(rq_job_status, rq_job_return_value)
+
+
+async def fetch_order_status_async(
+    connection: redis.asyncio.Redis,
+    job_id: str,
+    serializer: type[ORJSONSerializer] = ORJSONSerializer,
+) -> tuple[OrderStatus, str | None] | None:
+    async with connection.pipeline(transaction=False) as pipeline:
+        pipeline_order_status(pipeline, job_id)
+        response = await pipeline.execute()
+    return parse_order_status(job_id, *response, serializer=serializer)
+
+
+async def fetch_order_statuses_async(
+    connection: redis.asyncio.Redis,
+    job_ids: list[str],
+    serializer: type[ORJSONSerializer] = ORJSONSerializer,
+) -> list[tuple[OrderStatus, str | None] | None]:
+    # a single round trip for the whole batch, three replies per job
+    async with connection.pipeline(transaction=False) as pipeline:
+        for job_id in job_ids:
+            pipeline_order_status(pipeline, job_id)
+        response = await pipeline.execute()
+    return [
+        parse_order_status(job_id, *response[i * 3:i * 3 + 3], serializer=serializer)
+        for i, job_id in enumerate(job_ids)
+    ]
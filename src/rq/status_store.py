@@ -0,0 +1,97 @@
+import threading
+import typing as t
+from collections import OrderedDict
+from functools import cache
+
+from ..config import get_config
+from ..enums import (
+    OrderRejectionReason,
+    OrderStatus,
+)
+
+__all__ = (
+    "decode_order_status",
+    "decode_order_status_message",
+    "encode_order_status",
+    "encode_order_status_message",
+    "get_order_status_cache",
+    "get_order_status_key",
+    "OrderStatusCache",
+    "pipeline_save_order_status",
+)
+
+ORDER_STATUS_CHANNEL = "final_price:order_status"
+ORDER_STATUS_KEY_PREFIX = "final_price:order_status:"
+# codes are persisted in Redis, existing values must never change
+ORDER_STATUS_CODES: dict[OrderStatus, int] = {
+    OrderStatus.ACCEPTED: 1,
+    OrderStatus.ERROR: 2,
+    OrderStatus.REJECTED: 3,
+}
+ORDER_STATUS_BY_CODE: dict[int, OrderStatus] = {code: status for status, code in ORDER_STATUS_CODES.items()}
+ORDER_STATUS_DETAIL_CODES: dict[str, int] = {
+    reason.description: code for code, reason in enumerate(OrderRejectionReason, start=1)
+}
+ORDER_STATUS_DETAIL_BY_CODE: dict[int, str] = {code: detail for detail, code in ORDER_STATUS_DETAIL_CODES.items()}
+
+
+def get_order_status_key(order_id: str) -> str:
+    return f"{ORDER_STATUS_KEY_PREFIX}{order_id}"
+
+
+def encode_order_status(order_status: OrderStatus, detail: str | None) -> bytes:
+    # 1 byte status + 1 byte detail, detail code 0 stands for the status description
+    return bytes((ORDER_STATUS_CODES[order_status], ORDER_STATUS_DETAIL_CODES.get(detail, 0)))
+
+
+def decode_order_status(value: bytes) -> tuple[OrderStatus, str | None]:
+    return ORDER_STATUS_BY_CODE[value[0]], ORDER_STATUS_DETAIL_BY_CODE.get(value[1], None)
+
+
+def encode_order_status_message(order_id: str, value: bytes) -> bytes:
+    return order_id.encode() + value
+
+
+def decode_order_status_message(message: bytes) -> tuple[str, tuple[OrderStatus, str | None]]:
+    return message[:-2].decode(), decode_order_status(message[-2:])
+
+
+def pipeline_save_order_status(pipeline: t.Any, order_id: str, order_status: OrderStatus, detail: str | None) -> None:
+    # the terminal status outlives the job and its result, see `rq_order_status_ttl`
+    value = encode_order_status(order_status, detail)
+    pipeline.set(get_order_status_key(order_id), value, ex=get_config().rq_order_status_ttl)
+    # wakes up API processes waiting for the order status
+    pipeline.publish(ORDER_STATUS_CHANNEL, encode_order_status_message(order_id, value))
+
+
+class OrderStatusCache:
+    # per-process LRU of terminal order statuses, these never change once written
+    _items: OrderedDict[str, tuple[OrderStatus, str | None]]
+    _lock: threading.Lock
+    maxsize: int
+
+    def __init__(self, maxsize: int) -> None:
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+        self.maxsize = maxsize
+
+    def get(self, order_id: str) -> tuple[OrderStatus, str | None] | None:
+        with self._lock:
+            value = self._items.get(order_id, None)
+            if value is not None:
+                self._items.move_to_end(order_id)
+            return value
+
+    def set(self, order_id: str, value: tuple[OrderStatus, str | None]) -> None:
+        if not self.maxsize:
+            return
+        with self._lock:
+            self._items[order_id] = value
+            self._items.move_to_end(order_id)
+            if len(self._items) > self.maxsize:
+                self._items.popitem(last=False)
+
+
+@cache
+def get_order_status_cache() -> OrderStatusCache:
+    return OrderStatusCache(get_config().api_order_status_cache_size)
@@ -1,64 +1,88 @@
 import logging
 
-import redis
-import rq
+import redis.asyncio
 from redis.exceptions import ConnectionError
 
 from ..config import Config
+from .async_queue import AsyncQueue
+from .instrumentation import InstrumentedAsyncRedis
+from .listeners import OrderStatusListener
 from .serializers import ORJSONSerializer
 
 __all__ = (
-    "get_rq_queue",
-    "shutdown_redis_resources",
-    "startup_redis_resources",
+    "get_async_rq_queue",
+    "get_order_status_listener",
+    "shutdown_async_redis_resources",
+    "startup_async_redis_resources",
 )
 
 logger = logging.getLogger(__name__)
 
 
-_REDIS_CLIENT: redis.Redis | None = None
-_RQ_QUEUE: rq.Queue | None = None
+_ASYNC_REDIS_CLIENT: redis.asyncio.Redis | None = None
+_ASYNC_RQ_QUEUE: AsyncQueue | None = None
+_ORDER_STATUS_LISTENER: OrderStatusListener | None = None
 
 
-def _initialize_redis_resources(config: Config) -> None:
-    global _REDIS_CLIENT, _RQ_QUEUE
+async def _initialize_async_redis_resources(config: Config) -> None:
+    global _ASYNC_REDIS_CLIENT, _ASYNC_RQ_QUEUE
     redis_dsn = config.redis_dsn.unicode_string()
+    redis_client: redis.asyncio.Redis | None = None
     try:
-        redis_client = redis.Redis.from_url(redis_dsn)
-        redis_client.ping()
-        _REDIS_CLIENT = redis_client
-        _RQ_QUEUE = rq.Queue(
+        # a blocking pool makes bursts wait for a free connection instead of failing
+        redis_client = InstrumentedAsyncRedis.from_pool(
+            redis.asyncio.BlockingConnectionPool.from_url(
+                redis_dsn,
+                max_connections=config.redis_max_connections,
+                timeout=config.redis_pool_timeout,
+            )
+        )
+        await redis_client.ping()
+        _ASYNC_REDIS_CLIENT = redis_client
+        _ASYNC_RQ_QUEUE = AsyncQueue(
             name=config.rq_queue_name,
-            connection=_REDIS_CLIENT,
+            connection=_ASYNC_REDIS_CLIENT,
             serializer=ORJSONSerializer,
         )
-        logger.info("Successfully established Redis connection and RQ Queue")
+        logger.info("Successfully established async Redis connection pool and RQ Queue")
     except ConnectionError as e:
         logger.error(f"Failed to connect to Redis at {redis_dsn}: {e}")
-        _REDIS_CLIENT = None
-        _RQ_QUEUE = None
+        if redis_client is not None:
+            await redis_client.aclose()
+        _ASYNC_REDIS_CLIENT = None
+        _ASYNC_RQ_QUEUE = None
+
+
+def get_async_rq_queue() -> AsyncQueue:
+    if _ASYNC_RQ_QUEUE is None:
+        raise RuntimeError("Async Redis resources are not initialized")
+    return _ASYNC_RQ_QUEUE
 
 
-def get_rq_queue(config: Config) -> rq.Queue:
-    global _RQ_QUEUE
-    if _RQ_QUEUE is None:
-        _initialize_redis_resources(config)
-    return _RQ_QUEUE
+def get_order_status_listener() -> OrderStatusListener:
+    if _ORDER_STATUS_LISTENER is None:
+        raise RuntimeError("Async Redis resources are not initialized")
+    return _ORDER_STATUS_LISTENER
 
 
-def startup_redis_resources(config: Config) -> None:
-    global _REDIS_CLIENT, _RQ_QUEUE
-    logger.info("Initializing Redis connection and create RQ queue")
-    _initialize_redis_resources(config)
-    if _REDIS_CLIENT is None or _RQ_QUEUE is None:
-        raise RuntimeError("Failed to initialize Redis resources")
+async def startup_async_redis_resources(config: Config) -> None:
+    global _ORDER_STATUS_LISTENER
+    logger.info("Initializing async Redis connection pool and create RQ queue")
+    await _initialize_async_redis_resources(config)
+    if _ASYNC_REDIS_CLIENT is None or _ASYNC_RQ_QUEUE is None:
+        raise RuntimeError("Failed to initialize async Redis resources")
+    _ORDER_STATUS_LISTENER = OrderStatusListener(_ASYNC_REDIS_CLIENT)
+    await _ORDER_STATUS_LISTENER.start()
 
 
-def shutdown_redis_resources() -> None:
-    global _REDIS_CLIENT, _RQ_QUEUE
-    logger.info("Closing Redis connection")
-    if _REDIS_CLIENT:
-        _REDIS_CLIENT.close()
-        _REDIS_CLIENT = None
-    if _RQ_QUEUE:
-        _RQ_QUEUE = None
+async def shutdown_async_redis_resources() -> None:
+    global _ASYNC_REDIS_CLIENT, _ASYNC_RQ_QUEUE, _ORDER_STATUS_LISTENER
+    logger.info("Closing async Redis connection pool")
+    if _ORDER_STATUS_LISTENER:
+        await _ORDER_STATUS_LISTENER.stop()
+        _ORDER_STATUS_LISTENER = None
+    if _ASYNC_REDIS_CLIENT:
+        await _ASYNC_REDIS_CLIENT.aclose()
+        _ASYNC_REDIS_CLIENT = None
+    if _ASYNC_RQ_QUEUE:
+        _ASYNC_RQ_QUEUE = None
@@ -1,57 +1,303 @@
+import asyncio
 import logging
+import resource
+import time
+import typing as t
+from contextlib import contextmanager
 
+from rq.exceptions import DequeueTimeout
 from rq.queue import Queue
 from rq.worker import SimpleWorker, WorkerStatus
-from sqlalchemy import Engine
+from sqlalchemy import Engine, select
+from sqlalchemy.ext.asyncio import (
+    async_sessionmaker,
+    AsyncEngine,
+    AsyncSession,
+)
 from sqlalchemy.orm import (
     Session,
     sessionmaker,
 )
 
 from ..config import get_config
-from ..db.base import create_db_engine
+from ..db.base import (
+    create_async_db_engine,
+    create_db_engine,
+)
+from ..db.models import Order
+from ..metrics import (
+    observe_amortized,
+    start_metrics_exporter,
+    WORKER_JOB_DURATION,
+)
+from ..tracing import (
+    flush_spans,
+    record_span,
+    resume_trace,
+    TRACEPARENT_META_KEY,
+)
 from .job import DBJob
+from .processors import (
+    process_order,
+    process_orders,
+    process_orders_async,
+)
+from .reservations import (
+    PhoneNumberReservations,
+    SEED_BATCH_SIZE,
+)
 
-__all__ = ("DBWorker",)
+__all__ = (
+    "AsyncDBWorker",
+    "DBWorker",
+)
 
 logger = logging.getLogger(__name__)
 
+# the resolution of blocking Redis commands, which block forever with a zero timeout
+BATCH_MIN_WAIT = 0.001  # s.
+PROCESS_ORDER_FUNC_NAME = f"{process_order.__module__}.{process_order.__qualname__}"
+
 
 class DBWorker(SimpleWorker):
+    _batch_size: int
+    _batch_wait: float
     _db_engine: Engine | None
     _db_session: Session | None
+    _executed_jobs: int
+    _max_jobs: int | None
+    _max_memory: int | None
+    _phone_number_reservations: PhoneNumberReservations | None
 
     def __init__(self, *args, **kwargs):
         kwargs["job_class"] = DBJob
         super().__init__(*args, **kwargs)
+        config = get_config()
+        self._batch_size = config.rq_worker_batch_size
+        self._batch_wait = config.rq_worker_batch_wait / 1000
+        self._max_jobs = config.rq_worker_max_jobs
+        self._executed_jobs = 0
+        self._max_memory = config.rq_worker_max_memory * 1024 if config.rq_worker_max_memory else None  # KiB.
         self._db_engine = None
         self._db_session = None
+        self._phone_number_reservations = None
+        if config.rq_phone_number_reservation:
+            self._phone_number_reservations = PhoneNumberReservations(self.connection)
 
     def work(self, *args, **kwargs):
+        # the worker quits after `max_jobs` jobs, to be restarted by the pool or the container runtime,
+        # the limit is enforced here as RQ counts a whole batch as a single job
+        self._max_jobs = kwargs.pop("max_jobs", None) or self._max_jobs
+        if metrics_worker_port := get_config().metrics_worker_port:
+            start_metrics_exporter(metrics_worker_port)
         logger.info(f"Worker {self.name} starting up, initializing DB session")
         try:
+            # a single connection, the worker runs jobs one at a time in its own thread
             self._db_engine = create_db_engine(
                 get_config(),
                 {"application_name": f"rq_worker_{self.name}"},
+                pool_size=1,
+                max_overflow=0,
             )
             self._db_session = sessionmaker(self._db_engine, expire_on_commit=False)()
+            self._seed_phone_number_reservations()
             super().work(*args, **kwargs)
         finally:
             logger.info(f"Worker {self.name} shutting down, closing DB session")
             self._dispose_db_engine()
+            flush_spans()
 
     def execute_job(self, job: DBJob, queue: Queue) -> None:
-        self.prepare_execution(job)
-        self.attach_db_session(job)
-        self.perform_job(job, queue)
+        started_at = time.perf_counter()
+        if self._batch_size > 1:
+            jobs_count = self.execute_jobs_batch(job, queue)
+        else:
+            self.prepare_execution(job)
+            self.attach_db_session(job)
+            self.attach_phone_number_reservations(job)
+            with self._trace_job(job):
+                self.perform_job(job, queue)
+            self.set_state(WorkerStatus.IDLE)
+            jobs_count = 1
+        observe_amortized(WORKER_JOB_DURATION, time.perf_counter() - started_at, jobs_count)
+        self._executed_jobs += jobs_count
+        self._check_jobs_limit()
+        self._check_memory_limit()
+
+    def execute_jobs_batch(self, job: DBJob, queue: Queue) -> int:
+        batch_size = self._batch_size
+        if self._max_jobs:
+            # never more jobs than are left before the worker quits
+            batch_size = min(batch_size, self._max_jobs - self._executed_jobs)
+        jobs: list[tuple[DBJob, Queue]] = [(job, queue), *self._dequeue_jobs_batch(batch_size - 1)]
+        # every job is registered as started before the batch is written, so none is lost if the worker dies
+        executions = [self.prepare_execution(batch_job) for batch_job, _ in jobs]
+        started_at = time.time_ns()
+        self.attach_batch_results([batch_job for batch_job, _ in jobs])
+        finished_at = time.time_ns()
+        for (batch_job, batch_queue), execution in zip(jobs, executions):
+            self.execution = execution
+            self.attach_db_session(batch_job)
+            self.attach_phone_number_reservations(batch_job)
+            # the batch is shared by the traces of all of its jobs
+            record_span(
+                "process_orders_batch",
+                started_at,
+                finished_at,
+                batch_job.meta.get(TRACEPARENT_META_KEY, None),
+                {"batch.size": len(jobs)},
+            )
+            with self._trace_job(batch_job, started_at):
+                self.perform_job(batch_job, batch_queue)
         self.set_state(WorkerStatus.IDLE)
+        return len(jobs)
+
+    def attach_batch_results(self, jobs: list[DBJob]) -> None:
+        try:
+            orders: dict[str, dict] = {
+                job.id: job.kwargs["order"]
+                for job in jobs
+                if job.func_name == PROCESS_ORDER_FUNC_NAME
+            }
+            if not orders:
+                return
+            validated_order_ids = {job.id for job in jobs if job.kwargs.get("validated", False)}
+            batch_results = self._process_orders(orders, validated_order_ids)
+        except Exception as e:
+            # jobs fall back to being processed one by one
+            logger.error(f"Worker {self.name} failed to process orders batch: {e}")
+            return
+        for job in jobs:
+            if job.id in batch_results:
+                job.attach_batch_result(batch_results[job.id])
+
+    def _process_orders(self, orders: dict[str, dict], validated_order_ids: set[str]) -> dict[str, dict]:
+        return process_orders(
+            self._db_session,
+            orders,
+            validated_order_ids,
+            self._phone_number_reservations,
+        )
+
+    @contextmanager
+    def _trace_job(self, job: DBJob, dequeued_at: int | None = None) -> t.Iterator[None]:
+        # continues the trace started by the API, the queue wait lasts until the job is picked up (ns.)
+        traceparent = job.meta.get(TRACEPARENT_META_KEY, None)
+        with resume_trace("execute_job", traceparent, {"order.id": job.id, "worker.name": self.name}) as span:
+            if span is not None and job.enqueued_at:
+                record_span(
+                    "queue_wait",
+                    int(job.enqueued_at.timestamp() * 1_000_000_000),
+                    dequeued_at or span.start_time,
+                    traceparent,
+                )
+            yield
 
     def attach_db_session(self, job: DBJob) -> None:
         job.attach_db_session(self._db_session)
 
+    def attach_phone_number_reservations(self, job: DBJob) -> None:
+        job.attach_phone_number_reservations(self._phone_number_reservations)
+
+    def _dequeue_jobs_batch(self, size: int) -> list[tuple[DBJob, Queue]]:
+        result: list[tuple[DBJob, Queue]] = []
+        deadline = time.monotonic() + self._batch_wait
+        while len(result) < size:
+            # blocks for the rest of the wait, jobs already queued are taken without waiting once it is over
+            remaining = deadline - time.monotonic()
+            try:
+                dequeued = self.queue_class.dequeue_any(
+                    self._ordered_queues,
+                    remaining if remaining >= BATCH_MIN_WAIT else None,
+                    connection=self.connection,
+                    job_class=self.job_class,
+                    serializer=self.serializer,
+                    death_penalty_class=self.death_penalty_class,
+                )
+            except DequeueTimeout:
+                break
+            if dequeued is None:
+                break
+            job, _ = dequeued
+            job.redis_server_version = self.get_redis_server_version()
+            result.append(dequeued)
+        return result
+
+    def _seed_phone_number_reservations(self) -> None:
+        if not self._phone_number_reservations:
+            return
+        try:
+            rows = self._db_session.execute(
+                select(Order.id, Order.phone_number).execution_options(yield_per=SEED_BATCH_SIZE)
+            )
+            self._phone_number_reservations.seed(rows)
+            self._db_session.commit()
+        except Exception as e:
+            # duplicates are still caught by the unique constraint
+            logger.error(f"Worker {self.name} failed to seed phone number reservations: {e}")
+            self._db_session.rollback()
+
+    def _check_jobs_limit(self) -> None:
+        if self._max_jobs and self._executed_jobs >= self._max_jobs:
+            logger.info(f"Worker {self.name} finished executing {self._executed_jobs} jobs, stopping")
+            self._stop_requested = True
+
+    def _check_memory_limit(self) -> None:
+        if not self._max_memory:
+            return
+        # peak RSS of the process, in KiB on Linux
+        max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        if max_rss > self._max_memory:
+            logger.info(f"Worker {self.name} exceeded memory limit ({max_rss} KiB), stopping")
+            self._stop_requested = True
+
     def _dispose_db_engine(self) -> None:
         if self._db_engine:
             self._db_engine.dispose()
             self._db_engine = None
             self._db_session = None
             logger.info("SQLAlchemy Engine disposed and resources cleared")
+
+
+class AsyncDBWorker(DBWorker):
+    # up to `rq_worker_concurrency` orders dequeued together are inserted concurrently through a pooled
+    # `AsyncEngine`, jobs are then finished one by one on the regular RQ path, so job results are unchanged
+    _async_db_engine: AsyncEngine | None
+    _async_db_sessionmaker: async_sessionmaker[AsyncSession] | None
+    _loop: asyncio.AbstractEventLoop | None
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._batch_size = get_config().rq_worker_concurrency
+        self._async_db_engine = None
+        self._async_db_sessionmaker = None
+        self._loop = None
+
+    def work(self, *args, **kwargs):
+        self._loop = asyncio.new_event_loop()
+        self._async_db_engine = create_async_db_engine(
+            get_config(),
+            {"application_name": f"rq_async_worker_{self.name}"},
+            pool_size=self._batch_size,
+            max_overflow=0,
+        )
+        self._async_db_sessionmaker = async_sessionmaker(self._async_db_engine, expire_on_commit=False)
+        try:
+            super().work(*args, **kwargs)
+        finally:
+            self._loop.run_until_complete(self._async_db_engine.dispose())
+            self._loop.close()
+            self._async_db_engine = None
+            self._async_db_sessionmaker = None
+            self._loop = None
+
+    def _process_orders(self, orders: dict[str, dict], validated_order_ids: set[str]) -> dict[str, dict]:
+        # orders that failed are processed again one by one on the synchronous session
+        return self._loop.run_until_complete(
+            process_orders_async(
+                self._async_db_sessionmaker,
+                orders,
+                validated_order_ids,
+                self._phone_number_reservations,
+            )
+        )
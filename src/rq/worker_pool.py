@@ -0,0 +1,66 @@
+import multiprocessing
+import typing as t
+from multiprocessing.context import ForkProcess
+
+import redis
+from phonenumbers.phonemetadata import PhoneMetadata
+from rq.worker_pool import run_worker, WorkerPool
+
+from ..config import get_config
+from ..db.base import reset_db_engines
+from ..metrics import start_metrics_exporter
+from .job import DBJob
+from .serializers import ORJSONSerializer
+from .worker import DBWorker
+
+__all__ = ("DBWorkerPool",)
+
+
+class DBWorkerPool(WorkerPool):
+    # forks `DBWorker` processes from a single preloaded parent, so imports and libphonenumber metadata
+    # are shared copy-on-write, dead workers (crashed or recycled on max jobs / memory) are respawned
+    def __init__(
+        self,
+        queues: t.Iterable[str],
+        connection: redis.Redis,
+        num_workers: int = 1,
+        **kwargs,
+    ):
+        kwargs.setdefault("worker_class", DBWorker)
+        kwargs.setdefault("job_class", DBJob)
+        kwargs.setdefault("serializer", ORJSONSerializer)
+        super().__init__(queues, connection, num_workers, **kwargs)
+
+    def get_worker_process(
+        self,
+        name: str,
+        burst: bool,
+        _sleep: float = 0,
+        logging_level: str = "INFO",
+    ) -> ForkProcess:
+        return multiprocessing.get_context("fork").Process(
+            target=_run_db_worker,
+            args=(name, self._queue_names, self._connection_class, self._pool_class, self._pool_kwargs),
+            kwargs={
+                "_sleep": _sleep,
+                "burst": burst,
+                "logging_level": logging_level,
+                "worker_class": self.worker_class,
+                "job_class": self.job_class,
+                "serializer": self.serializer,
+            },
+            name=f"Worker {name} (WorkerPool {self.name})",
+        )
+
+    def start(self, burst: bool = False, logging_level: str = "INFO") -> None:
+        PhoneMetadata.load_all()
+        if metrics_worker_port := get_config().metrics_worker_port:
+            # served by the parent for all of its workers, see `PROMETHEUS_MULTIPROC_DIR`
+            start_metrics_exporter(metrics_worker_port)
+        super().start(burst, logging_level)
+
+
+def _run_db_worker(*args, **kwargs) -> None:
+    # every worker creates its own engine in `DBWorker.work`
+    reset_db_engines()
+    run_worker(*args, **kwargs)
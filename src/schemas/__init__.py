@@ -1,5 +1,6 @@
 from .order import (
     Order,
+    OrderBatchItem,
     OrderId,
     OrderStatus,
 )
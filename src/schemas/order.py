@@ -12,6 +12,7 @@ from ..enums import OrderStatus as OrderStatusEnum
 
 __all__ = (
     "Order",
+    "OrderBatchItem",
     "OrderId",
     "OrderStatus",
 )
@@ -38,6 +39,11 @@ class OrderId(BaseModel):
     id: t.Annotated[uuid.UUID, UUID4] = Field(...)
 
 
+class OrderBatchItem(BaseModel):
+    id: t.Annotated[uuid.UUID, UUID4] | None = Field(default=None)
+    errors: dict[str, str] | None = Field(default=None)
+
+
 class OrderStatus(BaseModel):
     status: OrderStatusEnum = Field(...)
     detail: str = Field(...)
@@ -1,10 +1,10 @@
-from .order import OrderService
+from .order import AsyncOrderService
 
 __all__ = (
-    "get_order_service",
-    "OrderService",
+    "AsyncOrderService",
+    "get_async_order_service",
 )
 
 
-def get_order_service() -> OrderService:
-    return OrderService()
+def get_async_order_service() -> AsyncOrderService:
+    return AsyncOrderService()
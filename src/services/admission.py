@@ -0,0 +1,105 @@
+import logging
+import time
+from functools import cache
+
+from fastapi import status
+from redis.exceptions import RedisError
+
+from ..config import Config, get_config
+from ..exceptions import HTTPException
+from ..metrics import (
+    ADMISSION_QUEUE_SATURATION,
+    ADMISSION_REJECTED_REQUESTS,
+)
+from ..rq.async_queue import AsyncQueue
+from ..rq.backlog import get_size_and_oldest_job_age_async
+
+__all__ = (
+    "get_queue_admission",
+    "QueueAdmission",
+)
+
+logger = logging.getLogger(__name__)
+
+
+class QueueAdmission:
+    # per-process view of the queue backlog, refreshed at most once per `api_admission_refresh_interval`,
+    # new orders are shed with a 429 while the backlog is above the limits instead of growing without bound
+    _max_queue_size: int | None
+    _max_queue_age: int | None
+    _oldest_job_enqueued_at: float | None
+    _queue_size: int
+    _refresh_interval: float
+    _refreshed_at: float
+    _refreshing: bool
+    _retry_after: str
+
+    def __init__(self, config: Config) -> None:
+        self._max_queue_size = config.api_admission_max_queue_size
+        self._max_queue_age = config.api_admission_max_queue_age
+        self._refresh_interval = config.api_admission_refresh_interval / 1000
+        self._retry_after = str(config.api_admission_retry_after)
+        self._queue_size = 0
+        self._oldest_job_enqueued_at = None  # time.monotonic()
+        self._refreshed_at = float("-inf")
+        self._refreshing = False
+
+    @property
+    def enabled(self) -> bool:
+        return self._max_queue_size is not None or self._max_queue_age is not None
+
+    def _should_refresh(self) -> bool:
+        # a single caller refreshes at a time, the others keep using the cached values meanwhile
+        if self._refreshing or time.monotonic() - self._refreshed_at < self._refresh_interval:
+            return False
+        self._refreshing = True
+        return True
+
+    def _update(self, queue_size: int, oldest_job_age: float | None) -> None:
+        current_time = time.monotonic()
+        self._queue_size = queue_size
+        self._oldest_job_enqueued_at = current_time - oldest_job_age if oldest_job_age is not None else None
+        self._refreshed_at = current_time
+        ADMISSION_QUEUE_SATURATION.set(self._get_saturation())
+
+    def _refresh_failed(self, e: RedisError) -> None:
+        # fails open, enqueueing reports Redis errors on its own
+        logger.error(f"Failed to refresh queue backlog: {e}")
+        self._refreshed_at = time.monotonic()
+
+    def _get_saturation(self) -> float:
+        # the backlog relative to the closest limit, 1 and above means new orders are shed
+        saturation = 0.0
+        if self._max_queue_size is not None:
+            saturation = self._queue_size / self._max_queue_size
+        if self._max_queue_age is not None and self._oldest_job_enqueued_at is not None:
+            saturation = max(saturation, (time.monotonic() - self._oldest_job_enqueued_at) / self._max_queue_age)
+        return saturation
+
+    def _admit(self) -> None:
+        if self._get_saturation() < 1:
+            return
+        ADMISSION_REJECTED_REQUESTS.inc()
+        raise HTTPException(
+            detail="Too many orders are waiting to be processed. Please try again later",
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            headers={"Retry-After": self._retry_after},
+        )
+
+    async def admit_async(self, queue: AsyncQueue) -> None:
+        if not self.enabled:
+            return
+        if self._should_refresh():
+            try:
+                self._update(*await get_size_and_oldest_job_age_async(queue))
+            except RedisError as e:
+                self._refresh_failed(e)
+            finally:
+                # also released when the request is cancelled or fails otherwise, the next caller refreshes
+                self._refreshing = False
+        self._admit()
+
+
+@cache
+def get_queue_admission() -> QueueAdmission:
+    return QueueAdmission(get_config())
@@ -1,15 +1,14 @@
-import rq
-
 from ..config import get_config, Config
-from ..rq import get_rq_queue
+from ..rq import get_async_rq_queue
+from ..rq.async_queue import AsyncQueue
 
-__all__ = ("BaseService",)
+__all__ = ("AsyncBaseService",)
 
 
-class BaseService:
+class AsyncBaseService:
     config: Config
-    rq_queue: rq.Queue
+    rq_queue: AsyncQueue
 
     def __init__(self) -> None:
         self.config = get_config()
-        self.rq_queue = get_rq_queue(self.config)
+        self.rq_queue = get_async_rq_queue()
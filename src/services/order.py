@@ -1,43 +1,202 @@
+import asyncio
+import hashlib
 import logging
 import typing as t
 import uuid
 
-import rq.exceptions
 from fastapi import status
+from pydantic import ValidationError
 from redis.exceptions import RedisError
-from rq.job import Job, JobStatus, Retry
+from rq.job import Retry
+from rq.queue import EnqueueData, Queue
 
-from ..enums import (
-    OrderProcessingStatus,
-    OrderStatus as OrderStatusEnum,
+from ..db.utils import (
+    get_existing_order_ids,
+    get_order_ids_loader,
 )
+from ..enums import OrderStatus as OrderStatusEnum
 from ..exceptions import HTTPException
-from ..rq.processors import process_order
+from ..rq import get_order_status_listener
+from ..rq.status import (
+    fetch_order_status_async,
+    fetch_order_statuses_async,
+)
+from ..rq.status_store import (
+    get_order_status_cache,
+    pipeline_save_order_status,
+)
 from ..schemas import (
     Order,
+    OrderBatchItem,
     OrderId,
     OrderStatus,
 )
-from .base import BaseService
+from ..tracing import (
+    get_traceparent,
+    start_span,
+    start_trace,
+    TRACEPARENT_META_KEY,
+)
+from ..utils import get_validation_errors
+from .admission import get_queue_admission
+from .base import AsyncBaseService
 
-__all__ = ("OrderService",)
+__all__ = ("AsyncOrderService",)
 
 logger = logging.getLogger(__name__)
 
+ORDER_IDEMPOTENCY_KEY_PREFIX = "final_price:order_idempotency:"
+# jobs are enqueued by name, so the API does not import the worker code and libphonenumber
+PROCESS_ORDER_FUNC_NAME = "src.rq.processors.process_order"
+
+
+class AsyncOrderService(AsyncBaseService):
+    def _prepare_orders_batch(
+        self,
+        payloads: list[dict[str, t.Any]],
+    ) -> tuple[list[OrderBatchItem], list[EnqueueData], dict[str, dict]]:
+        batch_max_size = self.config.api_orders_batch_max_size
+        if len(payloads) > batch_max_size:
+            raise HTTPException(
+                detail=f"Batch must contain at most {batch_max_size} orders",
+                status_code=status.HTTP_400_BAD_REQUEST,
+            )
+        result: list[OrderBatchItem] = []
+        orders: dict[uuid.UUID, Order] = {}
+        for payload in payloads:
+            try:
+                order = Order.model_validate(payload)
+            except ValidationError as e:
+                result.append(OrderBatchItem(errors=get_validation_errors(e.errors())))
+                continue
+            job_id = uuid.uuid4()
+            orders[job_id] = order
+            result.append(OrderBatchItem(id=job_id))
+        job_datas: list[EnqueueData] = []
+        rejections: dict[str, dict] = {}
+        job_params = self._job_additional_params
+        job_params["timeout"] = job_params.pop("job_timeout")
+        for job_id, (job_kwargs, rejection) in zip(orders, self._get_orders_job_kwargs(list(orders.values()))):
+            if rejection:
+                rejections[str(job_id)] = rejection
+                continue
+            job_datas.append(
+                Queue.prepare_data(
+                    PROCESS_ORDER_FUNC_NAME,
+                    kwargs=job_kwargs,
+                    job_id=str(job_id),
+                    **job_params,
+                )
+            )
+        return result, job_datas, rejections
+
+    def _get_orders_job_kwargs(self, orders: list[Order]) -> list[tuple[dict[str, t.Any] | None, dict | None]]:
+        # with edge validation invalid orders are rejected right away and never reach the queue
+        orders_data = [order.model_dump() for order in orders]
+        if not self.config.api_orders_edge_validation:
+            return [({"order": order_data}, None) for order_data in orders_data]
+        from ..rq.processors import validate_orders
+        return [
+            (None, rejection) if rejection else ({"order": normalized_fields, "validated": True}, None)
+            for rejection, normalized_fields in validate_orders(orders_data)
+        ]
+
+    @property
+    def _job_additional_params(self) -> dict[str, t.Any]:
+        result: dict[str, t.Any] = {
+            "job_timeout": self.config.rq_job_timeout,
+            "result_ttl": self.config.rq_job_result_ttl,
+            "failure_ttl": self.config.rq_job_failure_ttl,
+        }
+        if self.config.rq_job_retry:
+            result["retry"] = Retry(self.config.rq_job_retry_count)
+        if traceparent := get_traceparent():
+            # the worker continues the trace from there
+            result["meta"] = {TRACEPARENT_META_KEY: traceparent}
+        return result
+
+    @staticmethod
+    def _cache_order_status(
+        order_id: str,
+        order_status: tuple[OrderStatusEnum, str | None] | None,
+    ) -> None:
+        # only terminal statuses are cached, they never change
+        if order_status is not None and order_status[0] != OrderStatusEnum.PROCESSING:
+            get_order_status_cache().set(order_id, order_status)
+
+    def _get_order_claim(self, order: Order, idempotency_key: str | None) -> tuple[str, int, str] | None:
+        # the Redis key, its ttl and the payload hash, repeated submissions return the order id stored there
+        content_hash = hashlib.sha256(
+            "\0".join(" ".join(value.split()) for value in (order.user_name, order.phone_number)).encode()
+        ).hexdigest()
+        if idempotency_key:
+            if not self.config.api_orders_idempotency_ttl:
+                return None
+            key = f"{ORDER_IDEMPOTENCY_KEY_PREFIX}key:{idempotency_key}"
+            return key, self.config.api_orders_idempotency_ttl, content_hash
+        if not self.config.api_orders_dedup_ttl:
+            return None
+        return f"{ORDER_IDEMPOTENCY_KEY_PREFIX}content:{content_hash}", self.config.api_orders_dedup_ttl, content_hash
+
+    @staticmethod
+    def _get_claimed_order_id(claimed: bytes, content_hash: str) -> OrderId:
+        order_id, claimed_content_hash = claimed.decode().split(":")
+        if claimed_content_hash != content_hash:
+            raise HTTPException(
+                detail="Idempotency key has already been used with a different order",
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            )
+        return OrderId(id=uuid.UUID(order_id))
+
+    @classmethod
+    def _cache_rejections(cls, rejections: dict[str, dict]) -> None:
+        for order_id, rejection in rejections.items():
+            cls._cache_order_status(order_id, (OrderStatusEnum.REJECTED, rejection["detail"]))
+
+    @staticmethod
+    def _get_order_status(order_status: tuple[OrderStatusEnum, str | None] | None) -> OrderStatus:
+        if order_status is None:
+            raise HTTPException(
+                detail="Order not found",
+                status_code=status.HTTP_404_NOT_FOUND,
+            )
+        order_status_value, order_status_description = order_status
+        return OrderStatus(
+            status=order_status_value,
+            detail=order_status_description or order_status_value.description,
+        )
 
-class OrderService(BaseService):
-    def create_order(self, order: Order) -> OrderId:
+    async def create_order(self, order: Order, idempotency_key: str | None = None) -> OrderId:
+        with start_trace("create_order"):
+            return await self._create_order(order, idempotency_key)
+
+    async def _create_order(self, order: Order, idempotency_key: str | None) -> OrderId:
+        await get_queue_admission().admit_async(self.rq_queue)
         job_id = uuid.uuid4()
+        claim = self._get_order_claim(order, idempotency_key)
+        if claim:
+            with start_span("claim_order"):
+                claimed_order_id = await self._claim_order(claim, job_id)
+            if claimed_order_id:
+                return claimed_order_id
+        with start_span("prepare_order"):
+            ((job_kwargs, rejection),) = self._get_orders_job_kwargs([order])
         try:
-            self.rq_queue.enqueue(
-                process_order,
-                job_id=str(job_id),
-                order=order.model_dump(),
-                **self._job_additional_params,
-            )
+            if rejection:
+                await self._reject_orders({str(job_id): rejection})
+            else:
+                with start_span("enqueue_order", {"order.id": str(job_id)}):
+                    await self.rq_queue.enqueue(
+                        PROCESS_ORDER_FUNC_NAME,
+                        job_id=str(job_id),
+                        **job_kwargs,
+                        **self._job_additional_params,
+                    )
         except RedisError:
+            await self._release_order_claim(claim)
             raise
         except Exception as e:
+            await self._release_order_claim(claim)
             logger.error(f"Failed to create order: {e}", exc_info=True)
             raise HTTPException(
                 detail="Failed to create order",
@@ -45,62 +204,158 @@ class OrderService(BaseService):
             )
         return OrderId(id=job_id)
 
-    def get_order_status(self, order_id: uuid.UUID) -> OrderStatus:
-        order_status_description: str | None = None
+    async def create_orders(self, payloads: list[dict[str, t.Any]]) -> list[OrderBatchItem]:
+        with start_trace("create_orders"):
+            return await self._create_orders(payloads)
+
+    async def _create_orders(self, payloads: list[dict[str, t.Any]]) -> list[OrderBatchItem]:
+        await get_queue_admission().admit_async(self.rq_queue)
+        # validating a batch is CPU-bound, it runs in the default executor so the event loop keeps serving requests
+        result, job_datas, rejections = await asyncio.to_thread(self._prepare_orders_batch, payloads)
         try:
-            rq_job = self.rq_queue.fetch_job(str(order_id))
-            if not rq_job:
-                raise HTTPException(
-                    detail="Order not found",
-                    status_code=status.HTTP_404_NOT_FOUND,
-                )
-            order_status, order_status_description = self._get_order_status(rq_job)
-        except (HTTPException, RedisError):
+            if job_datas:
+                # all jobs are written through a single Redis pipeline
+                with start_span("enqueue_orders", {"orders.count": len(job_datas)}):
+                    await self.rq_queue.enqueue_many(job_datas)
+            if rejections:
+                await self._reject_orders(rejections)
+        except RedisError:
             raise
-        except rq.exceptions.InvalidJobOperation as e:
-            logger.error(f"Invalid job operation for order {order_id}: {e}")
-            return OrderStatus(
-                status=OrderStatusEnum.ERROR,
-                detail="Order is invalid",
-            )
         except Exception as e:
-            logger.error(f"Error fetching order status: {e}", exc_info=True)
-            order_status = OrderStatusEnum.ERROR
-        return OrderStatus(
-            status=order_status,
-            detail=order_status_description or order_status.description,
-        )
+            logger.error(f"Failed to create orders: {e}", exc_info=True)
+            raise HTTPException(
+                detail="Failed to create orders",
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            )
+        return result
 
-    @property
-    def _job_additional_params(self) -> dict[str, t.Any]:
-        result: dict[str, t.Any] = {
-            "job_timeout": self.config.rq_job_timeout,
-            "result_ttl": self.config.rq_job_result_ttl,
-            "failure_ttl": self.config.rq_job_failure_ttl,
+    async def _claim_order(self, claim: tuple[str, int, str], job_id: uuid.UUID) -> OrderId | None:
+        key, ttl, content_hash = claim
+        connection = self.rq_queue.connection
+        if await connection.set(key, f"{job_id}:{content_hash}", nx=True, ex=ttl):
+            return None
+        claimed = await connection.get(key)
+        return self._get_claimed_order_id(claimed, content_hash) if claimed else None
+
+    async def _release_order_claim(self, claim: tuple[str, int, str] | None) -> None:
+        if not claim:
+            return
+        try:
+            await self.rq_queue.connection.delete(claim[0])
+        except RedisError as e:
+            logger.error(f"Failed to release order idempotency key: {e}")
+
+    async def _reject_orders(self, rejections: dict[str, dict]) -> None:
+        async with self.rq_queue.connection.pipeline(transaction=False) as pipeline:
+            for order_id, rejection in rejections.items():
+                pipeline_save_order_status(pipeline, order_id, OrderStatusEnum.REJECTED, rejection["detail"])
+            await pipeline.execute()
+        self._cache_rejections(rejections)
+
+    async def get_order_status(self, order_id: uuid.UUID) -> OrderStatus:
+        order_status = get_order_status_cache().get(str(order_id))
+        if order_status is None:
+            try:
+                order_status = await fetch_order_status_async(
+                    self.rq_queue.connection,
+                    str(order_id),
+                    self.rq_queue.serializer,
+                )
+                if order_status is None and await get_order_ids_loader().exists(order_id):
+                    # the job and its status record have expired, but the order has been persisted
+                    order_status = OrderStatusEnum.ACCEPTED, None
+            except RedisError:
+                raise
+            except Exception as e:
+                logger.error(f"Error fetching order status: {e}", exc_info=True)
+                order_status = OrderStatusEnum.ERROR, None
+            else:
+                self._cache_order_status(str(order_id), order_status)
+        return self._get_order_status(order_status)
+
+    async def get_order_statuses(self, order_ids: list[uuid.UUID]) -> dict[uuid.UUID, OrderStatus | None]:
+        batch_max_size = self.config.api_order_status_batch_max_size
+        if len(order_ids) > batch_max_size:
+            raise HTTPException(
+                detail=f"Batch must contain at most {batch_max_size} order ids",
+                status_code=status.HTTP_400_BAD_REQUEST,
+            )
+        order_statuses: dict[uuid.UUID, tuple[OrderStatusEnum, str | None] | None] = {}
+        order_status_cache = get_order_status_cache()
+        missing_order_ids: list[uuid.UUID] = []
+        for order_id in dict.fromkeys(order_ids):
+            order_statuses[order_id] = order_status_cache.get(str(order_id))
+            if order_statuses[order_id] is None:
+                missing_order_ids.append(order_id)
+        if missing_order_ids:
+            try:
+                fetched_order_statuses = await fetch_order_statuses_async(
+                    self.rq_queue.connection,
+                    [str(order_id) for order_id in missing_order_ids],
+                    self.rq_queue.serializer,
+                )
+                expired_order_ids = [
+                    order_id
+                    for order_id, order_status in zip(missing_order_ids, fetched_order_statuses)
+                    if order_status is None
+                ]
+                existing_order_ids = await get_existing_order_ids(expired_order_ids) if expired_order_ids else set()
+            except RedisError:
+                raise
+            except Exception as e:
+                logger.error(f"Error fetching order statuses: {e}", exc_info=True)
+                for order_id in missing_order_ids:
+                    order_statuses[order_id] = OrderStatusEnum.ERROR, None
+            else:
+                for order_id, order_status in zip(missing_order_ids, fetched_order_statuses):
+                    if order_status is None and order_id in existing_order_ids:
+                        # the job and its status record have expired, but the order has been persisted
+                        order_status = OrderStatusEnum.ACCEPTED, None
+                    order_statuses[order_id] = order_status
+                    self._cache_order_status(str(order_id), order_status)
+        # unknown orders are mapped to `None` instead of failing the whole batch
+        return {
+            order_id: self._get_order_status(order_status) if order_status is not None else None
+            for order_id, order_status in order_statuses.items()
         }
-        if self.config.rq_job_retry:
-            result["retry"] = Retry(self.config.rq_job_retry_count)
-        return result
 
-    @staticmethod
-    def _get_order_status(rq_job: Job) -> tuple[OrderStatusEnum, str | None]:
-        rq_job_status: JobStatus = rq_job.get_status()
-        match rq_job_status:
-            case (
-                JobStatus.CREATED |
-                JobStatus.DEFERRED |
-                JobStatus.QUEUED |
-                JobStatus.SCHEDULED |
-                JobStatus.STARTED
-            ):
-                return OrderStatusEnum.PROCESSING, None
-            case JobStatus.CANCELED | JobStatus.FAILED | JobStatus.STOPPED:
-                return OrderStatusEnum.ERROR, None
-            case JobStatus.FINISHED:
-                rq_job_return_value = rq_job.return_value()
-                if rq_job_return_value:
-                    order_processing_status = rq_job_return_value.get("status", None)
-                    if order_processing_status == OrderProcessingStatus.ACCEPTED:
-                        return OrderStatusEnum.ACCEPTED, None
-                    return OrderStatusEnum.REJECTED, rq_job_return_value.get("detail", None)
-                return OrderStatusEnum.REJECTED, None
+    async def wait_order_status(self, order_id: uuid.UUID, timeout: int) -> OrderStatus:
+        max_timeout = self.config.api_order_status_max_wait
+        if timeout > max_timeout:
+            raise HTTPException(
+                detail=f"Wait time must not exceed {max_timeout} seconds",
+                status_code=status.HTTP_400_BAD_REQUEST,
+            )
+        if not timeout:
+            return await self.get_order_status(order_id)
+        # the waiter is registered before the status is read, so a completion in between is not lost
+        with get_order_status_listener().subscribe(str(order_id)) as waiter:
+            order_status = await self.get_order_status(order_id)
+            if order_status.status != OrderStatusEnum.PROCESSING:
+                return order_status
+            try:
+                final_order_status = await asyncio.wait_for(waiter, timeout)
+            except TimeoutError:
+                return order_status
+        self._cache_order_status(str(order_id), final_order_status)
+        return self._get_order_status(final_order_status)
+
+    async def stream_order_status(self, order_id: uuid.UUID) -> t.AsyncIterator[OrderStatus | None]:
+        # yields the current status, `None` on every keepalive interval and the final status
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.config.api_order_status_stream_timeout
+        keepalive = self.config.api_order_status_stream_keepalive
+        with get_order_status_listener().subscribe(str(order_id)) as waiter:
+            order_status = await self.get_order_status(order_id)
+            yield order_status
+            if order_status.status != OrderStatusEnum.PROCESSING:
+                return
+            while (timeout := deadline - loop.time()) > 0:
+                try:
+                    final_order_status = await asyncio.wait_for(asyncio.shield(waiter), min(timeout, keepalive))
+                except TimeoutError:
+                    yield None
+                    continue
+                self._cache_order_status(str(order_id), final_order_status)
+                yield self._get_order_status(final_order_status)
+                return
@@ -0,0 +1,321 @@
+import logging
+import os
+import random
+import threading
+import time
+import typing as t
+import urllib.request
+from abc import ABC, abstractmethod
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+import orjson
+
+from .config import Config, get_config
+from .enums import TracingExporter
+
+__all__ = (
+    "flush_spans",
+    "get_traceparent",
+    "record_span",
+    "resume_trace",
+    "Span",
+    "start_span",
+    "start_trace",
+    "TRACEPARENT_META_KEY",
+)
+
+logger = logging.getLogger(__name__)
+
+# the W3C trace context of the API span enqueueing a job is stored in the job meta under this key
+TRACEPARENT_META_KEY = "traceparent"
+TRACEPARENT_VERSION = "00"
+TRACEPARENT_SAMPLED_FLAG = "01"
+TRACING_SCOPE_NAME = "final_price"
+EXPORT_BATCH_SIZE = 512
+# spans are dropped beyond this size, when the exporter can not keep up
+EXPORT_QUEUE_MAX_SIZE = 16_384
+EXPORT_TIMEOUT = 5  # s.
+# https://opentelemetry.io/docs/specs/otlp/#json-protobuf-encoding
+OTLP_SPAN_KIND_INTERNAL = 1
+OTLP_STATUS_CODE_ERROR = 2
+
+_CURRENT_SPAN: ContextVar["Span | None"] = ContextVar("current_span", default=None)
+
+
+class Span:
+    __slots__ = (
+        "attributes",
+        "end_time",
+        "error",
+        "name",
+        "parent_span_id",
+        "span_id",
+        "start_time",
+        "trace_id",
+    )
+
+    def __init__(
+        self,
+        name: str,
+        trace_id: str,
+        parent_span_id: str | None,
+        start_time: int | None = None,
+        attributes: dict[str, t.Any] | None = None,
+    ) -> None:
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = os.urandom(8).hex()
+        self.parent_span_id = parent_span_id
+        self.start_time = start_time or time.time_ns()
+        self.end_time: int | None = None
+        self.attributes = attributes or {}
+        self.error: str | None = None
+
+    @property
+    def traceparent(self) -> str:
+        return f"{TRACEPARENT_VERSION}-{self.trace_id}-{self.span_id}-{TRACEPARENT_SAMPLED_FLAG}"
+
+    def set_attribute(self, key: str, value: t.Any) -> None:
+        self.attributes[key] = value
+
+    def to_otlp(self) -> dict[str, t.Any]:
+        result: dict[str, t.Any] = {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": OTLP_SPAN_KIND_INTERNAL,
+            "startTimeUnixNano": str(self.start_time),
+            "endTimeUnixNano": str(self.end_time or self.start_time),
+            "attributes": _to_otlp_attributes(self.attributes),
+        }
+        if self.parent_span_id:
+            result["parentSpanId"] = self.parent_span_id
+        if self.error:
+            result["status"] = {"code": OTLP_STATUS_CODE_ERROR, "message": self.error}
+        return result
+
+
+def _to_otlp_attributes(attributes: dict[str, t.Any]) -> list[dict[str, t.Any]]:
+    result: list[dict[str, t.Any]] = []
+    for key, value in attributes.items():
+        if isinstance(value, bool):
+            otlp_value = {"boolValue": value}
+        elif isinstance(value, int):
+            otlp_value = {"intValue": str(value)}
+        elif isinstance(value, float):
+            otlp_value = {"doubleValue": value}
+        else:
+            otlp_value = {"stringValue": str(value)}
+        result.append({"key": key, "value": otlp_value})
+    return result
+
+
+def _parse_traceparent(traceparent: str) -> tuple[str, str] | None:
+    # trace id and parent span id, `None` for malformed or not sampled contexts
+    parts = traceparent.split("-")
+    if len(parts) != 4 or len(parts[1]) != 32 or len(parts[2]) != 16 or parts[3] != TRACEPARENT_SAMPLED_FLAG:
+        return None
+    return parts[1], parts[2]
+
+
+class SpanExporter(ABC):
+    # finished spans are buffered and exported in batches by a background thread, never on the request path
+    _spans: deque[Span]
+
+    def __init__(self, config: Config) -> None:
+        self._spans = deque(maxlen=EXPORT_QUEUE_MAX_SIZE)
+        self._interval = config.tracing_export_interval
+        self._resource = {
+            "attributes": _to_otlp_attributes({
+                "service.name": config.tracing_service_name,
+                "process.pid": os.getpid(),
+            }),
+        }
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="span-exporter", daemon=True)
+        self._thread.start()
+
+    def add(self, span: Span) -> None:
+        self._spans.append(span)
+        if len(self._spans) >= EXPORT_BATCH_SIZE:
+            self._wakeup.set()
+
+    def flush(self) -> None:
+        with self._lock:
+            while self._spans:
+                spans: list[Span] = []
+                while self._spans and len(spans) < EXPORT_BATCH_SIZE:
+                    spans.append(self._spans.popleft())
+                try:
+                    self._export(orjson.dumps({
+                        "resourceSpans": [{
+                            "resource": self._resource,
+                            "scopeSpans": [{
+                                "scope": {"name": TRACING_SCOPE_NAME},
+                                "spans": [span.to_otlp() for span in spans],
+                            }],
+                        }],
+                    }))
+                except Exception as e:
+                    logger.error(f"Failed to export {len(spans)} spans: {e}")
+
+    def _run(self) -> None:
+        while True:
+            self._wakeup.wait(self._interval)
+            self._wakeup.clear()
+            self.flush()
+
+    @abstractmethod
+    def _export(self, payload: bytes) -> None:
+        pass
+
+
+class FileSpanExporter(SpanExporter):
+    # one OTLP JSON export request per line, the format read by the OpenTelemetry Collector `otlpjsonfile` receiver
+    def __init__(self, config: Config) -> None:
+        self._path = config.tracing_file
+        super().__init__(config)
+
+    def _export(self, payload: bytes) -> None:
+        with open(self._path, "ab") as f:
+            f.write(payload + b"\n")
+
+
+class OTLPSpanExporter(SpanExporter):
+    # OTLP over HTTP with JSON encoding, e.g. an OpenTelemetry Collector on port 4318
+    def __init__(self, config: Config) -> None:
+        self._endpoint = config.tracing_otlp_endpoint
+        super().__init__(config)
+
+    def _export(self, payload: bytes) -> None:
+        request = urllib.request.Request(
+            self._endpoint,
+            data=payload,
+            headers={"Content-Type": "application/json"},
+            method="POST",
+        )
+        with urllib.request.urlopen(request, timeout=EXPORT_TIMEOUT):
+            pass
+
+
+_EXPORTER: SpanExporter | None = None
+_EXPORTER_PID: int | None = None
+
+
+def _get_exporter() -> SpanExporter | None:
+    # one exporter per process, the thread of the parent does not survive a fork
+    global _EXPORTER, _EXPORTER_PID
+    config = get_config()
+    if config.tracing_exporter is None:
+        return None
+    if _EXPORTER is None or _EXPORTER_PID != os.getpid():
+        match config.tracing_exporter:
+            case TracingExporter.FILE:
+                _EXPORTER = FileSpanExporter(config)
+            case TracingExporter.OTLP:
+                _EXPORTER = OTLPSpanExporter(config)
+        _EXPORTER_PID = os.getpid()
+    return _EXPORTER
+
+
+def flush_spans() -> None:
+    if _EXPORTER is not None and _EXPORTER_PID == os.getpid():
+        _EXPORTER.flush()
+
+
+@contextmanager
+def _span(
+    exporter: SpanExporter,
+    name: str,
+    trace_id: str,
+    parent_span_id: str | None,
+    attributes: dict[str, t.Any] | None,
+) -> t.Iterator[Span]:
+    span = Span(name, trace_id, parent_span_id, attributes=attributes)
+    token = _CURRENT_SPAN.set(span)
+    try:
+        yield span
+    except BaseException as e:
+        span.error = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        span.end_time = time.time_ns()
+        _CURRENT_SPAN.reset(token)
+        exporter.add(span)
+
+
+@contextmanager
+def start_trace(name: str, attributes: dict[str, t.Any] | None = None) -> t.Iterator[Span | None]:
+    # a new sampled trace, or a child span when a trace is already in progress
+    exporter = _get_exporter()
+    if exporter is None:
+        yield None
+        return
+    if (parent := _CURRENT_SPAN.get()) is not None:
+        with _span(exporter, name, parent.trace_id, parent.span_id, attributes) as span:
+            yield span
+        return
+    if random.random() >= get_config().tracing_sample_rate:
+        yield None
+        return
+    with _span(exporter, name, os.urandom(16).hex(), None, attributes) as span:
+        yield span
+
+
+@contextmanager
+def resume_trace(
+    name: str,
+    traceparent: str | None,
+    attributes: dict[str, t.Any] | None = None,
+) -> t.Iterator[Span | None]:
+    # continues the trace of another process, nothing is recorded without a sampled parent
+    exporter = _get_exporter()
+    if exporter is None or not traceparent or (parent := _parse_traceparent(traceparent)) is None:
+        yield None
+        return
+    with _span(exporter, name, *parent, attributes) as span:
+        yield span
+
+
+@contextmanager
+def start_span(name: str, attributes: dict[str, t.Any] | None = None) -> t.Iterator[Span | None]:
+    # a child of the current span, nothing is recorded outside of a trace
+    parent = _CURRENT_SPAN.get()
+    exporter = _get_exporter() if parent is not None else None
+    if exporter is None:
+        yield None
+        return
+    with _span(exporter, name, parent.trace_id, parent.span_id, attributes) as span:
+        yield span
+
+
+def record_span(
+    name: str,
+    start_time: int,
+    end_time: int,
+    traceparent: str | None = None,
+    attributes: dict[str, t.Any] | None = None,
+) -> None:
+    # a span measured after the fact, times are in ns since the epoch, the parent is the current span by default
+    exporter = _get_exporter()
+    if exporter is None:
+        return
+    if traceparent:
+        parent = _parse_traceparent(traceparent)
+    elif (current := _CURRENT_SPAN.get()) is not None:
+        parent = current.trace_id, current.span_id
+    else:
+        parent = None
+    if parent is None:
+        return
+    span = Span(name, *parent, start_time=start_time, attributes=attributes)
+    span.end_time = end_time
+    exporter.add(span)
+
+
+def get_traceparent() -> str | None:
+    span = _CURRENT_SPAN.get()
+    return span.traceparent if span is not None else None
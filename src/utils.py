@@ -1,6 +1,9 @@
+import typing as t
+
 import argon2
 
 __all__ = (
+    "get_validation_errors",
     "hash_password",
     "verify_password",
 )
@@ -17,3 +20,7 @@ def verify_password(hash: str, raw_password: str) -> bool:
         return ph.verify(hash, raw_password)
     except argon2.exceptions.VerificationError:
         return False
+
+
+def get_validation_errors(errors: t.Sequence[t.Mapping[str, t.Any]]) -> dict[str, str]:
+    return {str(error["loc"][-1]): error["msg"] for error in errors}
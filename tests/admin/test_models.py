@@ -0,0 +1,140 @@
+import asyncio
+import uuid
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy.dialects.postgresql.psycopg import PGDialectAsync_psycopg
+from starlette.exceptions import HTTPException
+from starlette.requests import Request
+
+from src.admin import models
+from src.admin.models import OrderAdmin
+from src.config import Config
+from src.db.enums import UserRole
+from src.db.models import Order
+from src.db.utils import export
+from src.rq import reservations, utils
+
+PLAN_ROWS = 1_000_000
+
+
+class _Result:
+    def __init__(self, value: object) -> None:
+        self._value = value
+
+    def scalar_one(self) -> object:
+        return self._value
+
+
+class _Connection:
+    def __init__(self) -> None:
+        self.dialect = PGDialectAsync_psycopg()
+        # as detected on connect, with `standard_conforming_strings = on`
+        self.dialect._backslash_escapes = False
+        self.statements: list[tuple[str, dict]] = []
+
+    async def exec_driver_sql(self, statement: str, parameters: dict | None = None) -> _Result:
+        self.statements.append((statement, parameters))
+        return _Result([{"Plan": {"Plan Rows": PLAN_ROWS}}])
+
+
+class _Session:
+    def __init__(self, connection: _Connection) -> None:
+        self._connection = connection
+
+    async def __aenter__(self) -> "_Session":
+        return self
+
+    async def __aexit__(self, *args: object) -> None:
+        pass
+
+    async def connection(self) -> _Connection:
+        return self._connection
+
+
+def _get_request(query_string: str, session: dict | None = None) -> Request:
+    return Request({
+        "type": "http",
+        "method": "GET",
+        "path": "/admin/order/list",
+        "query_string": query_string.encode(),
+        "headers": [],
+        "session": session or {},
+    })
+
+
+def _get_order_admin(connection: _Connection) -> OrderAdmin:
+    view = OrderAdmin()
+    view.session_maker = lambda: _Session(connection)
+
+    async def run_query(stmt: object) -> list:
+        return []
+
+    async def run_arbitrary_query(stmt: object) -> list:
+        # the `reltuples` estimate of the unfiltered count
+        return [(PLAN_ROWS,)]
+
+    view._run_query = run_query
+    view._run_arbitrary_query = run_arbitrary_query
+    return view
+
+
+def test_list_name_search_count_binds_parameters() -> None:
+    connection = _Connection()
+    pagination = asyncio.run(_get_order_admin(connection).list(_get_request("search=John%20Smith")))
+
+    assert pagination.count == PLAN_ROWS
+    ((statement, parameters),) = connection.statements
+    assert statement.startswith("EXPLAIN (FORMAT JSON) ")
+    # a single backslash, as read by the server with standard conforming strings
+    assert "ESCAPE '\\'" in statement
+    assert "John Smith" not in statement
+    assert "%John Smith%" in parameters.values()
+
+
+def test_list_without_cursor_is_first_page() -> None:
+    pagination = asyncio.run(_get_order_admin(_Connection()).list(_get_request("page=500")))
+
+    assert pagination.page == 1
+
+
+class _PhoneNumberReservations:
+    def __init__(self, connection: object) -> None:
+        self.released: dict[str, str] = {}
+        self.confirmed: dict[str, str] = {}
+        _PhoneNumberReservations.instance = self
+
+    async def release_async(self, reservations: dict[str, str]) -> None:
+        self.released.update(reservations)
+
+    async def confirm_async(self, owners: dict[str, str]) -> None:
+        self.confirmed.update(owners)
+
+
+def test_edit_moves_phone_number_reservation(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(models, "get_config", lambda: Config(rq_phone_number_reservation=True))
+    monkeypatch.setattr(utils, "get_async_rq_queue", lambda: SimpleNamespace(connection=None))
+    monkeypatch.setattr(reservations, "PhoneNumberReservations", _PhoneNumberReservations)
+    view = OrderAdmin()
+    request = _get_request("")
+    order = Order(id=uuid.uuid4(), user_name="John Smith", phone_number="+16502530000")
+
+    async def edit() -> None:
+        await view.on_model_change({}, order, False, request)
+        order.phone_number = "+16502530001"
+        await view.after_model_change({}, order, False, request)
+
+    asyncio.run(edit())
+
+    assert _PhoneNumberReservations.instance.released == {"+16502530000": str(order.id)}
+    assert _PhoneNumberReservations.instance.confirmed == {"+16502530001": str(order.id)}
+
+
+def test_stream_export_rejects_parquet_without_pyarrow(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(export, "find_spec", lambda name: None)
+    monkeypatch.setattr(export, "export_orders_async", pytest.fail)
+    request = _get_request("format=parquet", {"role": UserRole.ADMIN})
+    with pytest.raises(HTTPException) as e:
+        asyncio.run(OrderAdmin().stream_export(request))
+    assert e.value.status_code == 400
+    assert "pyarrow" in e.value.detail
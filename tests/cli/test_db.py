@@ -0,0 +1,18 @@
+from pathlib import Path
+
+import pytest
+from click.testing import CliRunner
+
+from src.cli import cli
+from src.db.utils import export
+
+
+def test_export_orders_rejects_parquet_without_pyarrow(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> None:
+    monkeypatch.setattr(export, "find_spec", lambda name: None)
+    monkeypatch.setattr(export, "export_orders", pytest.fail)
+    output = tmp_path / "orders.parquet"
+    result = CliRunner().invoke(cli, ["export_orders", "-o", str(output), "-f", "PARQUET"])
+
+    assert result.exit_code == 2
+    assert "pyarrow" in result.output
+    assert not output.exists()
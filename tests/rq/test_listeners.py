@@ -0,0 +1,51 @@
+import asyncio
+
+from redis.exceptions import ConnectionError
+
+from src.enums import (
+    OrderRejectionReason,
+    OrderStatus,
+)
+from src.rq.listeners import OrderStatusListener
+from src.rq.status_store import (
+    encode_order_status,
+    get_order_status_key,
+)
+
+DETAIL = OrderRejectionReason.PHONE_NUMBER_ALREADY_REGISTERED.description
+
+
+class _Connection:
+    def __init__(self, values: dict[str, bytes], error: Exception | None = None) -> None:
+        self._values = values
+        self._error = error
+
+    async def mget(self, keys: list[str]) -> list[bytes | None]:
+        if self._error is not None:
+            raise self._error
+        return [self._values.get(key, None) for key in keys]
+
+
+def test_reconnect_resolves_waiters_from_status_store() -> None:
+    async def run() -> None:
+        listener = OrderStatusListener(_Connection({
+            get_order_status_key("finished"): encode_order_status(OrderStatus.REJECTED, DETAIL),
+        }))
+        with listener.subscribe("finished") as finished, listener.subscribe("pending") as pending:
+            await listener._on_reconnect(None)
+
+            assert finished.result() == (OrderStatus.REJECTED, DETAIL)
+            assert not pending.done()
+
+    asyncio.run(run())
+
+
+def test_reconnect_keeps_waiters_when_status_store_fails() -> None:
+    async def run() -> None:
+        listener = OrderStatusListener(_Connection({}, ConnectionError("Connection refused")))
+        with listener.subscribe("pending") as pending:
+            await listener._on_reconnect(None)
+
+            assert not pending.done()
+
+    asyncio.run(run())
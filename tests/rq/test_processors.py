@@ -0,0 +1,178 @@
+import itertools
+import random
+import uuid
+
+import pytest
+
+from src.enums import OrderProcessingStatus
+from src.rq.processors import (
+    process_orders,
+    validate_order,
+    validate_orders,
+)
+
+USER_NAMES = (
+    "John Smith",
+    "  John   Smith ",
+    "Zoë O’Neil-Brown",
+    "Jo",
+    "John2",
+    "John_Smith",
+    "",
+    " ",
+)
+PHONE_NUMBERS = (
+    "+16502530000",
+    "+1 (650) 253-0000",
+    " 1 650 253 0000 ",
+    "16502530000",
+    "+442079460958",
+    "+1650253000x",
+    "+16502530000000000",
+    "123456",
+    "+10000000000",
+    "+99912345678",
+    "+800 1234 5678",
+    "++16502530000",
+    "",
+)
+ORDERS = [
+    {"user_name": user_name, "phone_number": phone_number}
+    for user_name, phone_number in itertools.product(USER_NAMES, PHONE_NUMBERS)
+]
+# seeded, so a failing batch is reproduced by its seed
+RANDOM_BATCH_SEEDS = range(50)
+PHONE_NUMBER_ALPHABET = "0123456789+ ()-.x" "٠١٢٣٤٥٦٧٨٩" "０１２３４５６７８９＋"
+
+
+def _get_random_char(rng: random.Random, alphabet: str | None) -> str:
+    # an arbitrary code point outside the surrogate range when no alphabet is given
+    if alphabet:
+        return rng.choice(alphabet)
+    return chr(rng.choice((rng.randint(0x20, 0xD7FF), rng.randint(0xE000, 0x10FFFF))))
+
+
+def _get_random_text(rng: random.Random, alphabet: str | None, max_length: int) -> str:
+    return "".join(_get_random_char(rng, alphabet) for _ in range(rng.randint(0, max_length)))
+
+
+def _get_random_orders(rng: random.Random) -> list[dict]:
+    # valid and invalid orders mixed with repeats of the fixed corpus
+    orders = [
+        {
+            "user_name": _get_random_text(rng, rng.choice((None, "abcdefghijklmnopqrstuvwxyzÀÉÖøß '-")), 40),
+            "phone_number": _get_random_text(rng, PHONE_NUMBER_ALPHABET, 25),
+        }
+        for _ in range(rng.randint(0, 30))
+    ]
+    orders += rng.choices(ORDERS, k=rng.randint(0, 30))
+    rng.shuffle(orders)
+    return orders
+
+
+@pytest.mark.parametrize("order", ORDERS)
+def test_validate_orders_matches_validate_order(order: dict) -> None:
+    assert list(validate_orders([order])) == [validate_order(order)]
+
+
+def test_validate_orders_batch_matches_validate_order() -> None:
+    # repeated values are validated once per batch, every item still gets its own result
+    orders = ORDERS + ORDERS[::-1]
+    results = validate_orders(orders)
+    assert len(results) == len(orders)
+    assert list(results) == [validate_order(order) for order in orders]
+    for index, order in enumerate(orders):
+        rejection, normalized_fields = validate_order(order)
+        assert results.rejections[index] == rejection
+        assert results.user_names[index] == normalized_fields.get("user_name", None)
+        assert results.phone_numbers[index] == normalized_fields.get("phone_number", None)
+
+
+@pytest.mark.parametrize("seed", RANDOM_BATCH_SEEDS)
+def test_validate_orders_random_batch_matches_validate_order(seed: int) -> None:
+    orders = _get_random_orders(random.Random(seed))
+    assert list(validate_orders(orders)) == [validate_order(order) for order in orders]
+
+
+def test_validate_orders_empty_batch() -> None:
+    assert list(validate_orders([])) == []
+
+
+class _PhoneNumberReservations:
+    # the semantics of the `PhoneNumberReservations` scripts, without expiry
+    def __init__(self, owners: dict[str, str]) -> None:
+        self.owners = owners
+
+    def reserve(self, reservations: dict[str, str]) -> dict[str, str]:
+        return {
+            phone_number: self.owners.setdefault(phone_number, order_id)
+            for phone_number, order_id in reservations.items()
+        }
+
+    def take_over(self, stale_owners: dict[str, str], reservations: dict[str, str]) -> dict[str, str]:
+        for phone_number, order_id in reservations.items():
+            if self.owners.get(phone_number, stale_owners[phone_number]) == stale_owners[phone_number]:
+                self.owners[phone_number] = order_id
+        return {phone_number: self.owners[phone_number] for phone_number in reservations}
+
+    def confirm(self, owners: dict[str, str]) -> None:
+        self.owners.update(owners)
+
+    def release(self, reservations: dict[str, str]) -> None:
+        for phone_number, order_id in reservations.items():
+            if self.owners.get(phone_number, None) == order_id:
+                del self.owners[phone_number]
+
+
+class _Result(list):
+    def tuples(self) -> "_Result":
+        return self
+
+    def all(self) -> list:
+        return list(self)
+
+
+class _Session:
+    # `orders` rows as (phone number, id), every row passed to the INSERT is inserted
+    def __init__(self, rows: list[tuple[str, uuid.UUID]]) -> None:
+        self._rows = rows
+        self.inserted: list[dict] = []
+
+    def execute(self, stmt: object) -> _Result:
+        return _Result(self._rows)
+
+    def scalars(self, stmt: object) -> list[uuid.UUID]:
+        rows = stmt.compile().params
+        ids = [value for key, value in rows.items() if key.startswith("id_")]
+        self.inserted.extend(ids)
+        return ids
+
+    def commit(self) -> None:
+        pass
+
+    def rollback(self) -> None:
+        pass
+
+
+def test_process_orders_checks_reservations_of_other_orders() -> None:
+    registered_id, stale_id, order_ids = uuid.uuid4(), str(uuid.uuid4()), [str(uuid.uuid4()) for _ in range(2)]
+    phone_number_reservations = _PhoneNumberReservations({
+        # left behind by an order edited since, and registered by another order than the owner
+        "+16502530000": stale_id,
+        "+16502530001": stale_id,
+    })
+    db_session = _Session([("+16502530001", registered_id)])
+    orders = {
+        order_ids[0]: {"user_name": "John Smith", "phone_number": "+16502530000"},
+        order_ids[1]: {"user_name": "John Smith", "phone_number": "+16502530001"},
+    }
+
+    result = process_orders(db_session, orders, orders, phone_number_reservations)
+
+    assert result[order_ids[0]] == {"status": OrderProcessingStatus.ACCEPTED}
+    assert result[order_ids[1]]["status"] == OrderProcessingStatus.REJECTED
+    assert db_session.inserted == [uuid.UUID(order_ids[0])]
+    assert phone_number_reservations.owners == {
+        "+16502530000": order_ids[0],
+        "+16502530001": str(registered_id),
+    }
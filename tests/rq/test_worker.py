@@ -0,0 +1,65 @@
+from src.rq.worker import DBWorker
+
+
+class _Job:
+    enqueued_at = None
+    func_name = "builtins.dict"
+
+    def __init__(self, job_id: str) -> None:
+        self.id = job_id
+        self.kwargs: dict = {}
+        self.meta: dict = {}
+
+    def attach_db_session(self, db_session: object) -> None:
+        pass
+
+    def attach_phone_number_reservations(self, phone_number_reservations: object) -> None:
+        pass
+
+
+def _get_worker(batch_size: int, max_jobs: int, queued_jobs: list[_Job]) -> tuple[DBWorker, list[_Job]]:
+    worker = DBWorker.__new__(DBWorker)
+    worker.name = "worker"
+    worker._batch_size = batch_size
+    worker._batch_wait = 0
+    worker._max_jobs = max_jobs
+    worker._max_memory = None
+    worker._executed_jobs = 0
+    worker._db_session = None
+    worker._phone_number_reservations = None
+    worker._stop_requested = False
+    performed_jobs: list[_Job] = []
+
+    def dequeue_jobs_batch(size: int) -> list[tuple[_Job, None]]:
+        dequeued = queued_jobs[:size]
+        del queued_jobs[:size]
+        return [(job, None) for job in dequeued]
+
+    worker._dequeue_jobs_batch = dequeue_jobs_batch
+    worker.prepare_execution = lambda job: None
+    worker.perform_job = lambda job, queue: performed_jobs.append(job)
+    worker.set_state = lambda state: None
+    return worker, performed_jobs
+
+
+def test_batch_stops_worker_at_max_jobs() -> None:
+    queued_jobs = [_Job(f"job_{i}") for i in range(1, 10)]
+    worker, performed_jobs = _get_worker(10, 3, queued_jobs)
+
+    worker.execute_job(_Job("job_0"), None)
+
+    assert [job.id for job in performed_jobs] == ["job_0", "job_1", "job_2"]
+    assert len(queued_jobs) == 7
+    assert worker._stop_requested
+
+
+def test_batches_count_towards_max_jobs() -> None:
+    queued_jobs = [_Job(f"job_{i}") for i in range(1, 10)]
+    worker, performed_jobs = _get_worker(2, 3, queued_jobs)
+
+    worker.execute_job(_Job("job_0"), None)
+    assert not worker._stop_requested
+    worker.execute_job(queued_jobs.pop(0), None)
+
+    assert [job.id for job in performed_jobs] == ["job_0", "job_1", "job_2"]
+    assert worker._stop_requested
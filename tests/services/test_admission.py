@@ -0,0 +1,50 @@
+import asyncio
+
+import pytest
+
+from src.config import Config
+from src.exceptions import HTTPException
+from src.services import admission
+from src.services.admission import QueueAdmission
+
+
+def _get_queue_admission() -> QueueAdmission:
+    return QueueAdmission(Config(api_admission_max_queue_age=10, api_admission_refresh_interval=0))
+
+
+def test_admit_async_refreshes_again_after_cancelled_refresh(monkeypatch: pytest.MonkeyPatch) -> None:
+    queue_admission = _get_queue_admission()
+
+    async def cancelled(queue: object) -> tuple[int, float | None]:
+        raise asyncio.CancelledError
+
+    monkeypatch.setattr(admission, "get_size_and_oldest_job_age_async", cancelled)
+    with pytest.raises(asyncio.CancelledError):
+        asyncio.run(queue_admission.admit_async(None))
+
+    async def backlogged(queue: object) -> tuple[int, float | None]:
+        return 1, 60.0
+
+    monkeypatch.setattr(admission, "get_size_and_oldest_job_age_async", backlogged)
+    with pytest.raises(HTTPException) as e:
+        asyncio.run(queue_admission.admit_async(None))
+    assert e.value.status_code == 429
+
+
+def test_admit_async_refreshes_again_after_failed_refresh(monkeypatch: pytest.MonkeyPatch) -> None:
+    queue_admission = _get_queue_admission()
+
+    async def failed(queue: object) -> tuple[int, float | None]:
+        raise ValueError
+
+    monkeypatch.setattr(admission, "get_size_and_oldest_job_age_async", failed)
+    with pytest.raises(ValueError):
+        asyncio.run(queue_admission.admit_async(None))
+
+    async def empty(queue: object) -> tuple[int, float | None]:
+        return 0, None
+
+    monkeypatch.setattr(admission, "get_size_and_oldest_job_age_async", empty)
+    asyncio.run(queue_admission.admit_async(None))
+    assert queue_admission._queue_size == 0
+    assert queue_admission._refreshed_at > float("-inf")
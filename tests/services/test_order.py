@@ -0,0 +1,57 @@
+import asyncio
+import threading
+
+import pytest
+
+from src.config import Config
+from src.services import order
+from src.services.order import AsyncOrderService
+
+PAYLOADS = [
+    {"user_name": "John Smith", "phone_number": "+1 650 253 0000"},
+    {"user_name": "John Smith", "phone_number": "+99912345678"},
+]
+
+
+class _QueueAdmission:
+    async def admit_async(self, queue: object) -> None:
+        pass
+
+
+class _Queue:
+    def __init__(self) -> None:
+        self.job_datas: list = []
+
+    async def enqueue_many(self, job_datas: list) -> None:
+        self.job_datas.extend(job_datas)
+
+
+def test_create_orders_validates_batch_off_event_loop(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(order, "get_queue_admission", _QueueAdmission)
+    order_service = AsyncOrderService.__new__(AsyncOrderService)
+    order_service.config = Config(api_orders_edge_validation=True)
+    order_service.rq_queue = _Queue()
+    rejected: dict[str, dict] = {}
+
+    async def reject_orders(rejections: dict[str, dict]) -> None:
+        rejected.update(rejections)
+
+    order_service._reject_orders = reject_orders
+    threads: list[int] = []
+    prepare_orders_batch = order_service._prepare_orders_batch
+
+    def _prepare_orders_batch(payloads: list[dict]) -> tuple:
+        threads.append(threading.get_ident())
+        return prepare_orders_batch(payloads)
+
+    order_service._prepare_orders_batch = _prepare_orders_batch
+
+    async def run() -> tuple[list, int]:
+        return await order_service.create_orders(PAYLOADS), threading.get_ident()
+
+    result, loop_thread = asyncio.run(run())
+
+    assert threads and threads[0] != loop_thread
+    assert all(item.id for item in result)
+    assert len(order_service.rq_queue.job_datas) == 1
+    assert list(rejected) == [str(result[1].id)]